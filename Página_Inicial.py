@@ -5,10 +5,7 @@ import time
 import plotly.express as px
 import plotly.graph_objects as go
 
-# 🔄 COMPARTILHAR DADOS ENTRE PÁGINAS
-@st.cache_data
-def carregar_dados():
-    return pd.read_parquet('dados_tratados/df_EF_EM_bncc_censo.parquet')
+import dados_dashboard as dados
 
 # CONFIGURAÇÕES DA PÁGINA
 st.set_page_config(
@@ -18,17 +15,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Limpar cache periodicamente
-if 'clear_cache' not in st.session_state:
-    st.session_state.clear_cache = True
-    st.cache_data.clear()
-
-# Carregar dados se não estiverem em cache
-if 'df' not in st.session_state:
-    st.session_state.df = carregar_dados()
-
-# Acessar dados
-df = st.session_state.df
+# 🔄 COMPARTILHAR DADOS ENTRE PÁGINAS
+# Os dados são carregados uma única vez por processo e compartilhados (somente leitura) por todas as
+# sessões (ver dados_dashboard.py); os filtros laterais usam o cubo de agregados (as mesmas DIRECs,
+# municípios e escolas da base completa). Na sessão de cada usuário ficam só os filtros. Os caches
+# são refeitos sozinhos quando o processamento_local.py grava dados novos.
 
 
 # 🔄 COMPARTILHAR FILTROS ENTRE PÁGINAS
@@ -46,7 +37,7 @@ if 'filtro_escola' not in st.session_state:
 st.sidebar.title("Filtros")
 
 # 1. Escolher a DIREC
-direc_options = ['Todas'] + sorted(df['DIREC'].dropna().unique().tolist())
+direc_options = dados.opcoes_direc()
 selected_direc = st.sidebar.selectbox("Selecione a DIREC:",
                                       options=direc_options,
                                       index=direc_options.index(st.session_state.filtro_direc))
@@ -58,15 +49,7 @@ if selected_direc != st.session_state.filtro_direc:
     st.session_state.filtro_escola = 'Todas'
 
 # 2. Escolher o Município (usando cache para opções)
-@st.cache_data(ttl=300)
-def get_municipio_options(_df, direc):
-    if direc != 'Todas':
-        df_temp = _df[_df['DIREC'] == direc]
-    else:
-        df_temp = _df
-    return ['Todos'] + sorted(df_temp['MUNICÍPIO'].dropna().unique().tolist())
-
-municipio_options = get_municipio_options(df, selected_direc)
+municipio_options = dados.opcoes_municipio(selected_direc)
 selected_municipio = st.sidebar.selectbox("Selecione o Município:",
                                           options=municipio_options,
                                           index=municipio_options.index(st.session_state.filtro_municipio))
@@ -76,52 +59,20 @@ if selected_municipio != st.session_state.filtro_municipio:
     st.session_state.filtro_municipio = selected_municipio
     st.session_state.filtro_escola = 'Todas'
 
-# 3. Escolher a Escola (usando cache para opções)
-@st.cache_data(ttl=300)
-def get_escola_options(_df, direc, municipio):
-    df_temp = _df.copy()
-    if direc != 'Todas':
-        df_temp = df_temp[df_temp['DIREC'] == direc]
-    if municipio != 'Todos':
-        df_temp = df_temp[df_temp['MUNICÍPIO'] == municipio]
-    
-    df_temp['ESCOLA_FORMATADA'] = (
-        df_temp['ESCOLA'].astype(str) + " (cód. Inep: " + df_temp['INEP ESCOLA'].astype(str) + ")"
-    )
-    return ['Todas'] + sorted(df_temp['ESCOLA_FORMATADA'].dropna().unique().tolist())
-
-escola_options = get_escola_options(df, selected_direc, selected_municipio)
-selected_escola_formatada = st.sidebar.selectbox("Selecione a Escola:",
-                                                 options=escola_options,
-                                                 index=escola_options.index(st.session_state.filtro_escola))
+# 3. Escolher a Escola (pelo código INEP; o nome e o código aparecem como rótulo da opção)
+escola_options = dados.opcoes_escola(selected_direc, selected_municipio)
+rotulos_escolas = dados.rotulos_escolas()
+selected_escola = st.sidebar.selectbox("Selecione a Escola:",
+                                       options=escola_options,
+                                       index=escola_options.index(st.session_state.filtro_escola),
+                                       format_func=lambda escola: rotulos_escolas.get(escola, escola))
 
 # Atualizar session state
-if selected_escola_formatada != st.session_state.filtro_escola:
-    st.session_state.filtro_escola = selected_escola_formatada
-
-# APLICAR TODOS OS FILTROS DE UMA VEZ (COM CACHE)
-@st.cache_data(ttl=300)
-def aplicar_filtros(_df, direc, municipio, escola):
-    df_filtrado = _df.copy()
-    
-    if direc != 'Todas':
-        df_filtrado = df_filtrado[df_filtrado['DIREC'] == direc]
-    
-    if municipio != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['MUNICÍPIO'] == municipio]
-    
-    # Criar coluna formatada para escolas (apenas se necessário)
-    if escola != 'Todas' or 'ESCOLA_FORMATADA' not in df_filtrado.columns:
-        df_filtrado['ESCOLA_FORMATADA'] = (
-            df_filtrado['ESCOLA'].astype(str) + " (cód. Inep: " + df_filtrado['INEP ESCOLA'].astype(str) + ")"
-        )
-    
-    if escola != 'Todas':
-        df_filtrado = df_filtrado[df_filtrado['ESCOLA_FORMATADA'] == escola]
-    
-    return df_filtrado
-
-df_filtered = aplicar_filtros(df, selected_direc, selected_municipio, selected_escola_formatada)
+if selected_escola != st.session_state.filtro_escola:
+    st.session_state.filtro_escola = selected_escola
+
+# APLICAR TODOS OS FILTROS DE UMA VEZ (COM CACHE COMPARTILHADO ENTRE AS SESSÕES)
+df_filtered = dados.filtrar_cubo(selected_direc, selected_municipio, selected_escola)
 
 
 # Botão para limpar todos os filtros
@@ -129,7 +80,6 @@ if st.sidebar.button("🔄 Limpar Todos os Filtros"):
     st.session_state.filtro_direc = 'Todas'
     st.session_state.filtro_municipio = 'Todos'
     st.session_state.filtro_escola = 'Todas'
-    st.cache_data.clear()
     st.rerun()
 
 # CONFIGURAÇÕES DA PÁGINA
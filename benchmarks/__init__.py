@@ -0,0 +1 @@
+# Benchmarks do processamento local e do dashboard (rodar a partir da raiz do repositório com `python -m benchmarks.<nome>`)
@@ -0,0 +1,57 @@
+"""
+Mede o cache incremental de shards .parquet da leitura das notas e confere a ida e volta dos shards.
+
+Gera relatórios do SIGEduc sintéticos (`benchmarks.dados_sinteticos`, com CPFs como texto e como
+número misturados na mesma coluna) e, para cada leitor, roda `pl.ler_arquivos_notas_incremental`
+duas vezes numa pasta de cache nova: a primeira lê o Excel e grava os shards, a segunda lê só os
+shards. Confere que os DataFrames lidos dos shards são idênticos aos lidos do Excel (CPF PESSOA
+como texto) e que os dois leitores dão as mesmas chaves de CPF. Uso (a partir da raiz do
+repositório):
+
+    python -m benchmarks.cache_notas [--linhas 20000] [--linhas-por-arquivo 10000]
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import processamento_local as pl
+from benchmarks.dados_sinteticos import gerar_dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=20_000)
+    parser.add_argument("--linhas-por-arquivo", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta_notas, _ = gerar_dados(pasta, args.linhas, linhas_por_arquivo=args.linhas_por_arquivo)
+        arquivos = sorted(glob.glob(os.path.join(pasta_notas, "*.xlsx")))
+        chaves_cpf = {}
+        print(f"{'leitor':<10} {'Excel + shards (s)':>19} {'só shards (s)':>14}")
+        for leitor in ("pandas", "openpyxl"):
+            pasta_cache = os.path.join(pasta, f"cache_{leitor}")
+            inicio = time.perf_counter()
+            do_excel = pl.ler_arquivos_notas_incremental(arquivos, pasta_cache=pasta_cache, n_processos=1, leitor=leitor)
+            t_excel = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            dos_shards = pl.ler_arquivos_notas_incremental(arquivos, pasta_cache=pasta_cache, n_processos=1, leitor=leitor)
+            t_shards = time.perf_counter() - inicio
+
+            for df_excel, df_shard in zip(do_excel, dos_shards):
+                assert df_excel["CPF PESSOA"].dtype == "string"
+                pd.testing.assert_frame_equal(df_excel, df_shard)
+            chaves_cpf[leitor] = np.concatenate([pl.normalizar_cpf(df["CPF PESSOA"]) for df in do_excel])
+            print(f"{leitor:<10} {t_excel:>19.2f} {t_shards:>14.2f}")
+
+        np.testing.assert_array_equal(chaves_cpf["pandas"], chaves_cpf["openpyxl"])
+        print("shards idênticos à leitura do Excel; mesmos CPFs nos dois leitores")
+
+
+if __name__ == "__main__":
+    main()
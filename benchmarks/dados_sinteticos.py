@@ -0,0 +1,330 @@
+"""
+Gera relatórios de notas do SIGEduc (.xlsx) e uma planilha do Censo Escolar fictícios.
+
+Os arquivos têm o mesmo layout que `processamento_local.processar_dados_brutos` espera: 2 linhas de
+título antes do cabeçalho, as 38 colunas do relatório, notas como texto com vírgula decimal (com
+vazios e valores inválidos), séries com grafias misturadas ("6º Ano" e "6º ANO") e séries fora da
+análise, componentes fora da BNCC e CPFs em formatos variados (com e sem pontuação, como número sem
+os zeros à esquerda, com espaços ou vazios). Cada estudante tem uma linha por componente, com
+notas correlacionadas (um "nível" por estudante), então as taxas de reprovação são plausíveis.
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.dados_sinteticos pasta_destino --linhas 100000 [--linhas-por-arquivo 200000]
+
+Cria `pasta_destino/notas/notas_XXX.xlsx` e `pasta_destino/censo.xlsx`.
+"""
+import argparse
+import os
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+import processamento_local as pl
+from esquema_dados import CATEGORIAS_DIREC, aplicar_esquema
+
+# colunas do relatório do SIGEduc, na ordem do arquivo exportado
+COLUNAS_SIGEDUC = [
+    "ID DIREC", "DIREC", "ID MUNICÍPIO", "MUNICÍPIO", "ID ESCOLA", "INEP ESCOLA", "ESCOLA",
+    "ID ETAPA ENSINO", "ETAPA ENSINO", "PERIODICIDADE ETAPA ENSINO", "ID SÉRIE", "SÉRIE", "ID TURMA",
+    "TURMA", "TURNO", "ID PESSOA (PROFESSOR)", "MATRICULA (PROFESSOR)", "VÍNCULO", "NOME DO PROFESSOR",
+    "DATA INÍCIO ALOCAÇÃO", "DATA FIM ALOCAÇÃO", "ID COMPONENTE CURRICULAR", "COMPONENTE CURRICULAR",
+    "PERIODICIDADE COMPONENTE CURRICULAR", "ID PESSOA", "CPF PESSOA", "MATRÍCULA ESTUDANTE",
+    "NOME ESTUDANTE", "NOTA 1º BIMESTRE", "NOTA 2º BIMESTRE", "NOTA 3º BIMESTRE", "NOTA 4º BIMESTRE",
+    "MÉDIA ANUAL", "EXAME FINAL", "AVALIAÇÃO ESPECIAL", "MÉDIA FINAL", "RESULTADO FINAL",
+    "APROVEITAMENTO DE ESTUDO",
+]
+
+# séries (com a grafia variando como no SIGEduc), etapa de ensino e proporção de estudantes;
+# o 5º ano e a EJA ficam fora da análise
+SERIES = [
+    ("6º Ano", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.08), ("6º ANO", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.06),
+    ("7º Ano", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.07), ("7º ANO", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.06),
+    ("8º Ano", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.07), ("8º ANO", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.06),
+    ("9º Ano", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.06), ("9º ANO", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.06),
+    ("1ª SÉRIE", "ENSINO MÉDIO", 0.14), ("2ª SÉRIE", "ENSINO MÉDIO", 0.12), ("3ª SÉRIE", "ENSINO MÉDIO", 0.10),
+    ("5º Ano", "ENSINO FUNDAMENTAL DE 9 ANOS", 0.05), ("EJA - 3º SEGMENTO", "EDUCAÇÃO DE JOVENS E ADULTOS", 0.07),
+]
+
+# componentes de cada etapa (os últimos de cada lista não são da BNCC)
+COMPONENTES_FUNDAMENTAL = ["Arte", "Ciências", "Educação Física", "Geografia", "História", "Língua Inglesa",
+                           "Língua Portuguesa", "Matemática", "Ensino Religioso", "Projeto de Vida"]
+COMPONENTES_MEDIO = ["Arte", "Biologia", "Educação Física", "Filosofia", "Física", "Geografia", "História",
+                     "Língua Inglesa", "Língua Portuguesa", "Matemática", "Química", "Sociologia",
+                     "Projeto de Vida", "Eletiva"]
+
+MUNICIPIOS_POR_DIREC = 10
+ESCOLAS_POR_MUNICIPIO = 5
+
+
+def gerar_escolas(rng):
+    """Tabela (listas paralelas) das escolas fictícias: DIREC, município e código Inep."""
+    escolas = []
+    for d, direc in enumerate(CATEGORIAS_DIREC, start=1):
+        for m in range(MUNICIPIOS_POR_DIREC):
+            id_municipio = d * 100 + m
+            municipio = f"MUNICÍPIO {d:02d}-{m:02d}"
+            for _ in range(rng.integers(1, 2 * ESCOLAS_POR_MUNICIPIO)):
+                inep = 24_000_000 + len(escolas) * 7 + 1
+                escolas.append((d, direc, id_municipio, municipio, len(escolas) + 1, inep,
+                                f"ESCOLA ESTADUAL {len(escolas) + 1:04d}"))
+    return escolas
+
+
+def formatar_notas(notas, rng):
+    """Notas como texto com vírgula decimal; NaN vira vazio e ~0,5% vira um valor inválido."""
+    textos = np.char.replace(np.char.mod("%.1f", np.nan_to_num(notas)), ".", ",").astype(object)
+    textos[np.isnan(notas)] = None
+    textos[rng.random(len(notas)) < 0.005] = "-"
+    return textos
+
+
+def formatar_cpfs(cpfs, rng):
+    """CPFs (inteiros) nos formatos encontrados nas exportações: texto com 11 dígitos, com pontuação,
+    número (sem zeros à esquerda), com espaços ou vazio."""
+    textos = np.char.zfill(cpfs.astype(str), 11).astype(object)
+    sorteio = rng.random(len(cpfs))
+    pontuados = sorteio < 0.07
+    textos[pontuados] = [f"{c[:3]}.{c[3:6]}.{c[6:9]}-{c[9:]}" for c in textos[pontuados]]
+    numeros = (sorteio >= 0.07) & (sorteio < 0.12)
+    textos[numeros] = cpfs[numeros].tolist()
+    espacos = (sorteio >= 0.12) & (sorteio < 0.14)
+    textos[espacos] = [f" {c} " for c in textos[espacos]]
+    textos[sorteio >= 0.999] = None
+    return textos
+
+
+def gerar_bloco(rng, escolas, linhas, primeiro_estudante):
+    """
+    Gera estudantes até completar `linhas` linhas (uma por estudante x componente).
+
+    Returns
+    -------
+    tuple of (list of list, numpy.ndarray)
+        Colunas na ordem de COLUNAS_SIGEDUC e CPFs (inteiros) dos estudantes gerados.
+    """
+    n_estudantes = linhas // 10 + 1
+    pesos = np.array([p for _, _, p in SERIES])
+    serie = rng.choice(len(SERIES), n_estudantes, p=pesos / pesos.sum())
+    medio = np.array([etapa == "ENSINO MÉDIO" for _, etapa, _ in SERIES])[serie]
+    n_componentes = np.where(medio, len(COMPONENTES_MEDIO), len(COMPONENTES_FUNDAMENTAL))
+    # cortar no último estudante que cabe e completar com componentes do último
+    fim = np.cumsum(n_componentes)
+    n_estudantes = int(np.searchsorted(fim, linhas)) + 1
+    serie, medio, n_componentes = serie[:n_estudantes], medio[:n_estudantes], n_componentes[:n_estudantes]
+
+    escola = rng.integers(0, len(escolas), n_estudantes)
+    nivel = rng.normal(6.4, 1.6, n_estudantes)
+    cpfs = rng.integers(10**8, 10**11, n_estudantes)
+
+    # uma linha por estudante x componente
+    estudante = np.repeat(np.arange(n_estudantes), n_componentes)[:linhas]
+    posicao = np.arange(len(estudante)) - np.repeat(fim[:n_estudantes] - n_componentes, n_componentes)[:linhas]
+    componentes = np.where(medio[estudante],
+                           np.array(COMPONENTES_MEDIO, dtype=object)[np.minimum(posicao, len(COMPONENTES_MEDIO) - 1)],
+                           np.array(COMPONENTES_FUNDAMENTAL + [None] * 4, dtype=object)[posicao])
+
+    tabela_escolas = [np.array(coluna, dtype=object) for coluna in zip(*escolas)]
+    id_direc, direc, id_municipio, municipio, id_escola, inep, nome_escola = (c[escola[estudante]] for c in tabela_escolas)
+    series = np.array([s for s, _, _ in SERIES], dtype=object)[serie[estudante]]
+    etapas = np.array([e for _, e, _ in SERIES], dtype=object)[serie[estudante]]
+
+    # notas: nível do estudante + variação por componente; 1º e 2º bimestres quase todos lançados,
+    # 3º e 4º quase todos vazios (extração no meio do ano)
+    notas = {}
+    for coluna, lancadas in [("NOTA 1º BIMESTRE", 0.9), ("NOTA 2º BIMESTRE", 0.8),
+                             ("NOTA 3º BIMESTRE", 0.05), ("NOTA 4º BIMESTRE", 0.0)]:
+        valores = np.clip(np.round(nivel[estudante] + rng.normal(0, 1.4, len(estudante)), 1), 0, 10)
+        valores[rng.random(len(estudante)) >= lancadas] = np.nan
+        notas[coluna] = formatar_notas(valores, rng)
+    vazio = np.full(len(estudante), None, dtype=object)
+
+    id_pessoa = primeiro_estudante + estudante
+    colunas = {
+        "ID DIREC": id_direc, "DIREC": direc, "ID MUNICÍPIO": id_municipio, "MUNICÍPIO": municipio,
+        "ID ESCOLA": id_escola, "INEP ESCOLA": inep, "ESCOLA": nome_escola,
+        "ID ETAPA ENSINO": np.where(medio[estudante], 3, 2), "ETAPA ENSINO": etapas,
+        "PERIODICIDADE ETAPA ENSINO": np.full(len(estudante), "ANUAL", dtype=object),
+        "ID SÉRIE": serie[estudante] + 1, "SÉRIE": series, "ID TURMA": escola[estudante] * 20 + serie[estudante],
+        "TURMA": np.full(len(estudante), "A", dtype=object),
+        "TURNO": np.where(medio[estudante], "MATUTINO", "VESPERTINO").astype(object),
+        "ID PESSOA (PROFESSOR)": posicao + 1, "MATRICULA (PROFESSOR)": posicao + 1000,
+        "VÍNCULO": np.full(len(estudante), "EFETIVO", dtype=object),
+        "NOME DO PROFESSOR": np.full(len(estudante), "PROFESSOR(A)", dtype=object),
+        "DATA INÍCIO ALOCAÇÃO": np.full(len(estudante), "03/02/2025", dtype=object), "DATA FIM ALOCAÇÃO": vazio,
+        "ID COMPONENTE CURRICULAR": posicao + 1, "COMPONENTE CURRICULAR": componentes,
+        "PERIODICIDADE COMPONENTE CURRICULAR": np.full(len(estudante), "BIMESTRAL", dtype=object),
+        "ID PESSOA": id_pessoa, "CPF PESSOA": formatar_cpfs(cpfs[estudante], rng),
+        "MATRÍCULA ESTUDANTE": id_pessoa + 2025_000_000,
+        "NOME ESTUDANTE": np.char.add("ESTUDANTE ", id_pessoa.astype(str)).astype(object),
+        **notas,
+        "MÉDIA ANUAL": vazio, "EXAME FINAL": vazio, "AVALIAÇÃO ESPECIAL": vazio, "MÉDIA FINAL": vazio,
+        "RESULTADO FINAL": np.full(len(estudante), "CURSANDO", dtype=object), "APROVEITAMENTO DE ESTUDO": vazio,
+    }
+    return [colunas[c].tolist() for c in COLUNAS_SIGEDUC], cpfs
+
+
+# partes fixas de um .xlsx com uma única planilha (as células de texto são gravadas como "inlineStr",
+# sem a tabela de textos compartilhados, o que permite escrever a planilha em streaming)
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PACOTE = "http://schemas.openxmlformats.org/package/2006/relationships"
+_PARTES_XLSX = {
+    "[Content_Types].xml": (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/></Types>'),
+    "_rels/.rels": (
+        f'<Relationships xmlns="{_NS_PACOTE}"><Relationship Id="rId1" '
+        f'Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/></Relationships>'),
+    "xl/_rels/workbook.xml.rels": (
+        f'<Relationships xmlns="{_NS_PACOTE}"><Relationship Id="rId1" '
+        f'Type="{_NS_REL}/worksheet" Target="worksheets/sheet1.xml"/></Relationships>'),
+}
+
+
+def _celulas(valores):
+    """Trechos XML das células de uma coluna (texto, número ou vazio)."""
+    return [
+        "<c/>" if v is None
+        else '<c t="inlineStr"><is><t xml:space="preserve">' + escape(v) + "</t></is></c>" if isinstance(v, str)
+        else "<c><v>" + str(v) + "</v></c>"
+        for v in valores
+    ]
+
+
+def salvar_planilha(arquivo, nome_planilha, linhas_iniciais, colunas, linhas_por_escrita=10_000):
+    """
+    Grava um .xlsx com uma planilha: `linhas_iniciais` (listas de valores) e depois os dados, dados
+    como uma lista de colunas.
+
+    Escreve o XML da planilha diretamente, em streaming, o que é bem mais rápido que o openpyxl
+    para milhões de linhas; o arquivo é lido normalmente pelo Excel, openpyxl e pandas.
+    """
+    with zipfile.ZipFile(arquivo, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for nome, conteudo in _PARTES_XLSX.items():
+            zf.writestr(nome, _XML + conteudo)
+        zf.writestr("xl/workbook.xml", _XML + (
+            f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}"><sheets>'
+            f'<sheet name="{escape(nome_planilha)}" sheetId="1" r:id="rId1"/></sheets></workbook>'))
+        with zf.open("xl/worksheets/sheet1.xml", "w") as planilha:
+            planilha.write((_XML + f'<worksheet xmlns="{_NS_MAIN}"><sheetData>').encode("utf-8"))
+            for linha in linhas_iniciais:
+                planilha.write(("<row>" + "".join(_celulas(linha)) + "</row>").encode("utf-8"))
+            n_linhas = len(colunas[0])
+            for inicio in range(0, n_linhas, linhas_por_escrita):
+                celulas = [_celulas(coluna[inicio:inicio + linhas_por_escrita]) for coluna in colunas]
+                planilha.write("".join("<row>" + "".join(linha) + "</row>" for linha in zip(*celulas)).encode("utf-8"))
+            planilha.write(b"</sheetData></worksheet>")
+
+
+def salvar_relatorio_sigeduc(arquivo, colunas):
+    """Grava um relatório no layout do SIGEduc: 2 linhas de título, cabeçalho e dados."""
+    titulo = [["RELATÓRIO DE NOTAS POR COMPONENTE CURRICULAR"], ["Emitido em 10/10/2025"], COLUNAS_SIGEDUC]
+    salvar_planilha(arquivo, "Relatório", titulo, colunas)
+
+
+def salvar_censo(arquivo, cpfs, rng):
+    """
+    Grava a planilha do Censo Escolar: ~95% dos estudantes do SIGEduc mais ~3% que não estão
+    no SIGEduc, com os CPFs em formatos variados.
+    """
+    presentes = cpfs[rng.random(len(cpfs)) < 0.95]
+    ausentes = rng.integers(10**8, 10**11, max(1, len(cpfs) * 3 // 100))
+    todos = np.concatenate([presentes, ausentes])
+    rng.shuffle(todos)
+    nomes = np.char.add("ALUNO ", np.char.zfill((todos % 1_000_000).astype(str), 6)).tolist()
+    colunas = [formatar_cpfs(todos, rng).tolist(), nomes, ["01/01/2010"] * len(todos)]
+    salvar_planilha(arquivo, "Censo", [["CPF", "NOME", "DATA DE NASCIMENTO"]], colunas)
+
+
+def gerar_dados(pasta, linhas, linhas_por_arquivo=200_000, semente=0):
+    """
+    Gera `linhas` linhas de notas em `pasta/notas/notas_XXX.xlsx` (até `linhas_por_arquivo` por
+    arquivo) e a planilha `pasta/censo.xlsx`. Com a mesma semente, os arquivos são os mesmos.
+
+    Returns
+    -------
+    tuple of (str, str)
+        Pasta dos relatórios de notas e caminho da planilha do Censo.
+    """
+    rng = np.random.default_rng(semente)
+    pasta_notas = os.path.join(pasta, "notas")
+    os.makedirs(pasta_notas, exist_ok=True)
+    escolas = gerar_escolas(rng)
+
+    # limite de linhas de uma planilha do Excel, descontando título e cabeçalho
+    linhas_por_arquivo = min(linhas_por_arquivo, 1_048_576 - 3)
+    cpfs, primeiro_estudante = [], 1
+    for n, inicio in enumerate(range(0, linhas, linhas_por_arquivo)):
+        colunas, cpfs_bloco = gerar_bloco(rng, escolas, min(linhas_por_arquivo, linhas - inicio), primeiro_estudante)
+        salvar_relatorio_sigeduc(os.path.join(pasta_notas, f"notas_{n:03d}.xlsx"), colunas)
+        cpfs.append(cpfs_bloco)
+        primeiro_estudante += len(cpfs_bloco)
+
+    arquivo_censo = os.path.join(pasta, "censo.xlsx")
+    salvar_censo(arquivo_censo, np.concatenate(cpfs), rng)
+    return pasta_notas, arquivo_censo
+
+
+def gerar_dados_tratados(linhas, linhas_por_bloco=200_000, semente=0):
+    """
+    Gera, em memória, as saídas do processamento_local.py para `linhas` linhas de notas
+    sintéticas, sem passar pelo Excel: a base completa, o cubo de agregados e a tabela de
+    estudantes (os mesmos DataFrames que o dashboard lê de dados_tratados/).
+
+    As linhas passam pelas mesmas funções do processamento (limpeza, filtros, status, esquema,
+    cubo e tabela de estudantes). No lugar do cruzamento com o Censo, ficam as linhas com CPF válido.
+
+    Returns
+    -------
+    tuple of (pandas.DataFrame, pandas.DataFrame, pandas.DataFrame)
+        Base completa, cubo de agregados e tabela de estudantes.
+    """
+    rng = np.random.default_rng(semente)
+    escolas = gerar_escolas(rng)
+
+    blocos, primeiro_estudante = [], 1
+    for inicio in range(0, linhas, linhas_por_bloco):
+        colunas, cpfs_bloco = gerar_bloco(rng, escolas, min(linhas_por_bloco, linhas - inicio), primeiro_estudante)
+        primeiro_estudante += len(cpfs_bloco)
+        df = pl.limpar_notas(pd.DataFrame(dict(zip(COLUNAS_SIGEDUC, colunas))))
+        # tipos atribuídos pelo leitor em streaming
+        df["INEP ESCOLA"] = pd.to_numeric(df["INEP ESCOLA"], errors="coerce").astype("UInt32")
+        df["CPF PESSOA"] = df["CPF PESSOA"].astype("string")
+        blocos.append(pl.filtrar_anos_finais_ensino_medio(df))
+
+    df = pl.calcular_status(pd.concat(blocos, ignore_index=True))
+    aplicar_esquema(df)
+
+    chaves = pl.normalizar_cpf(df["CPF PESSOA"])
+    validos = chaves >= 0
+    df = df[validos].reset_index(drop=True)
+    df["CPF PESSOA"] = pl.formatar_cpf(chaves[validos])
+    return df, pl.montar_cubo(df), pl.montar_tabela_estudantes(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pasta", help="pasta de destino")
+    parser.add_argument("--linhas", type=int, default=100_000, help="total de linhas de notas (10 mil a 10 milhões)")
+    parser.add_argument("--linhas-por-arquivo", type=int, default=200_000)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    pasta_notas, arquivo_censo = gerar_dados(args.pasta, args.linhas, args.linhas_por_arquivo, args.semente)
+    segundos = time.perf_counter() - inicio
+    print(f"{args.linhas:,} linhas em {pasta_notas} e Censo em {arquivo_censo} "
+          f"({segundos:.1f} s, {args.linhas / segundos:,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
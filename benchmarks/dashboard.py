@@ -0,0 +1,221 @@
+"""
+Mede os cálculos de cada gráfico do dashboard, sem o Streamlit, para vários filtros laterais.
+
+Usa as funções de `calculos_dashboard` (as mesmas que as páginas chamam) sobre dados sintéticos
+gerados em memória com `benchmarks.dados_sinteticos.gerar_dados_tratados` ou sobre os arquivos
+de uma pasta dados_tratados/ (`--dados`). Para cada combinação da matriz de filtros (Todas, uma
+DIREC, um município e uma escola - as mais frequentes da base), repete cada cálculo e mostra
+a mediana (p50) e o percentil 95 (p95) do tempo, em milissegundos. Uso (a partir da raiz do
+repositório):
+
+    python -m benchmarks.dashboard [--linhas 1000000] [--repeticoes 20] [--dados dados_tratados]
+                                   [--limite-cache MB] [--max-entradas N]
+
+Para cada filtro lateral, confere também as médias do cubo com as médias exatas das notas da base
+completa (empates arredondados para cima). No final, simula a navegação por todas as DIRECs,
+municípios e escolas com o cache de seleções (`calc.CacheSelecoes`) e mostra acertos, faltas,
+descartes e memória ocupada.
+"""
+import argparse
+import math
+import os
+import time
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+import plotly.io
+import plotly.tools
+
+import calculos_dashboard as calc
+import graficos_dashboard as graf
+from benchmarks.dados_sinteticos import gerar_dados_tratados
+
+
+def carregar_dados_tratados(pasta):
+    """Lê a base completa, o cubo e a tabela de estudantes gravados pelo processamento_local.py."""
+    return tuple(pd.read_parquet(os.path.join(pasta, arquivo))
+                 for arquivo in ["df_EF_EM_bncc_censo.parquet", "cubo_notas.parquet", "estudantes.parquet"])
+
+
+def matriz_filtros(df):
+    """
+    Filtros laterais medidos: nenhum, a DIREC mais frequente, o município mais frequente (com a
+    sua DIREC) e a escola mais frequente (com a sua DIREC e o seu município).
+
+    Returns
+    -------
+    list of (str, tuple)
+        Nome do caso e argumentos (direc, municipio, escola) de `calc.aplicar_filtros`.
+    """
+    direc = df['DIREC'].value_counts().index[0]
+    linha_municipio = df[df['MUNICÍPIO'] == df['MUNICÍPIO'].value_counts().index[0]].iloc[0]
+    linha_escola = df[df['INEP ESCOLA'] == df['INEP ESCOLA'].value_counts().index[0]].iloc[0]
+    return [
+        ("Todas", ('Todas', 'Todos', 'Todas')),
+        ("DIREC", (direc, 'Todos', 'Todas')),
+        ("município", (linha_municipio['DIREC'], linha_municipio['MUNICÍPIO'], 'Todas')),
+        ("escola", (linha_escola['DIREC'], linha_escola['MUNICÍPIO'], int(linha_escola['INEP ESCOLA']))),
+    ]
+
+
+def medir(funcao, repeticoes):
+    """Tempos (ms) de `repeticoes` chamadas de `funcao`."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def calculos(df, cubo, estudantes, indice_cubo, indice_estudantes, filtros):
+    """
+    Cálculos de uma renderização das páginas para um filtro lateral, na ordem em que as páginas
+    os fazem (os selectboxes dos gráficos em 'Todas'). Os filtros laterais são medidos com máscaras
+    sobre a tabela inteira (`calc.aplicar_filtros`) e com o índice hierárquico que o dashboard usa.
+
+    Returns
+    -------
+    dict
+        Nome do cálculo -> função sem argumentos.
+    """
+    direc, municipio, _ = filtros
+    cubo_filtrado = indice_cubo.selecionar(*filtros)
+    estudantes_filtrados = indice_estudantes.selecionar(*filtros)
+    # figuras por DIREC: montada a cada execução x do cache de figuras (impressão da tabela + acerto),
+    # e exibida (o que o st.plotly_chart ainda faz com a figura do cache a cada execução)
+    medias_direc = calc.medias_por_direc(cubo_filtrado)
+    situacao_direc = calc.situacao_por_direc(estudantes_filtrados)
+    cache_figuras = graf.CacheFiguras(2**20)
+
+    def figura_do_cache(construtor, tabela):
+        return cache_figuras.obter((construtor.__name__, graf.impressao_tabela(tabela)), lambda: construtor(tabela),
+                                   tamanho=graf.CacheFiguras.tamanho_tabela(tabela))
+    return {
+        "filtro base completa": lambda: calc.aplicar_filtros(df, *filtros),
+        "filtro cubo": lambda: calc.aplicar_filtros(cubo, *filtros),
+        "filtro cubo (índice)": lambda: indice_cubo.selecionar(*filtros),
+        "filtro estudantes": lambda: calc.aplicar_filtros(estudantes, *filtros),
+        "filtro estudantes (índice)": lambda: indice_estudantes.selecionar(*filtros),
+        "opções laterais": lambda: (calc.opcoes_direc(cubo), calc.opcoes_municipio(cubo, direc),
+                                    calc.opcoes_escola(cubo, direc, municipio)),
+        "opções laterais (índice)": lambda: (indice_cubo.opcoes_direc(), indice_cubo.opcoes_municipio(direc),
+                                             indice_cubo.opcoes_escola(direc, municipio)),
+        "opções gráficos": lambda: [calc.opcoes_coluna(tabela, coluna)
+                                    for tabela in (indice_cubo.selecionar(*filtros), indice_estudantes.selecionar(*filtros))
+                                    for coluna in calc.COLUNAS_OPCOES if coluna in tabela.columns],
+        "opções gráficos (catálogo)": lambda: [indice.opcoes_grafico(*filtros, coluna)
+                                               for indice in (indice_cubo, indice_estudantes)
+                                               for coluna in calc.COLUNAS_OPCOES if coluna in indice.df.columns],
+        "aprovação por componente": lambda: calc.aprovacao_por_componente(calc.filtrar_grafico(cubo_filtrado)),
+        "médias por componente": lambda: calc.medias_por_componente(calc.filtrar_grafico(cubo_filtrado)),
+        "médias por DIREC": lambda: calc.medias_por_direc(calc.filtrar_grafico(cubo_filtrado)),
+        "situação geral": lambda: calc.resumo_situacao(calc.filtrar_grafico(estudantes_filtrados)),
+        "situação por DIREC": lambda: calc.situacao_por_direc(calc.filtrar_grafico(estudantes_filtrados)),
+        "situação por série": lambda: calc.situacao_por_serie(estudantes_filtrados),
+        "situação (3 seções)": lambda: calc.SituacaoEstudantes(estudantes_filtrados),
+        "figura médias DIREC": lambda: graf.figura_medias_por_direc(medias_direc),
+        "figura médias DIREC (cache)": lambda: figura_do_cache(graf.figura_medias_por_direc, medias_direc),
+        "figura médias DIREC (exibida)": lambda: serializar_como_plotly_chart(
+            figura_do_cache(graf.figura_medias_por_direc, medias_direc)),
+        "figura situação DIREC": lambda: graf.figura_situacao_por_direc(situacao_direc),
+        "figura situação DIREC (cache)": lambda: figura_do_cache(graf.figura_situacao_por_direc, situacao_direc),
+    }
+
+
+def serializar_como_plotly_chart(figura):
+    """Especificação JSON da figura, como o st.plotly_chart a monta (cópia com to_dict + to_json)."""
+    return plotly.io.to_json(plotly.tools.return_figure_from_figure_or_data(figura, validate_figure=True),
+                             validate=False)
+
+
+def conferir_medias(df, indice_cubo, filtros):
+    """
+    Confere as médias do cubo (`calc.calcular_medias`, por componente e por DIREC) com as médias
+    exatas das notas da base completa: frações soma/quantidade das notas em milésimos, arredondadas
+    para 2 casas com os empates para cima. Devolve (médias conferidas, empates .xx5 entre elas).
+    """
+    base = calc.aplicar_filtros(df, *filtros)
+    cubo = indice_cubo.selecionar(*filtros)
+    conferidas = empates = 0
+    for coluna_grupo in ['COMPONENTE CURRICULAR', 'DIREC']:
+        medias = calc.calcular_medias(cubo, coluna_grupo)
+        for coluna in calc.COLUNAS_MEDIAS:
+            notas = base[coluna].to_numpy(dtype='float64', na_value=np.nan)
+            lancadas = ~np.isnan(notas)
+            grupos = pd.DataFrame({'milesimos': np.rint(np.where(lancadas, notas, 0) * 1000).astype('int64'),
+                                   'quantidade': lancadas.astype('int64')})
+            grupos = grupos.groupby(base[coluna_grupo].to_numpy(), sort=False).sum()
+            for grupo, (milesimos, quantidade) in grupos.iterrows():
+                if quantidade == 0:
+                    assert np.isnan(medias.loc[grupo, coluna])
+                    continue
+                media = Fraction(int(milesimos), int(quantidade) * 1000)
+                empates += (media * 1000) % 10 == 5
+                assert medias.loc[grupo, coluna] == math.floor(media * 100 + Fraction(1, 2)) / 100, (grupo, coluna)
+                conferidas += 1
+    return conferidas, empates
+
+
+def simular_cache(indice_cubo, indice_estudantes, limite_mb, rodadas, max_entradas=None):
+    """
+    Repete `rodadas` vezes as seleções de todas as DIRECs, municípios e escolas (com os filtros de
+    gráfico das páginas) num `calc.CacheSelecoes` de `limite_mb` (e até `max_entradas` entradas) e
+    devolve as estatísticas do cache.
+    """
+    cache = calc.CacheSelecoes(limite_mb * 2**20, max_entradas=max_entradas)
+    filtros_graficos = [('Todas', 'Todas', 'Todos'), ('Ensino Médio', 'Todas', 'Todos'), ('Todas', '1ª SÉRIE', 'Todos'),
+                        ('Ens. Fund. - Anos Finais', 'Todas', 'Matemática')]
+    laterais = [(direc, 'Todos', 'Todas') for direc in indice_cubo.opcoes_direc()]
+    laterais += [('Todas', municipio, 'Todas') for municipio in indice_cubo.opcoes_municipio('Todas')[1:]]
+    laterais += [('Todas', 'Todos', escola) for escola in indice_cubo.opcoes_escola('Todas', 'Todos')[1:]]
+    for _ in range(rodadas):
+        for filtros in laterais:
+            for grafico in filtros_graficos:
+                # a tabela de estudantes não tem componente curricular (só etapa e série)
+                for nome, indice, argumentos in [('cubo', indice_cubo, filtros + grafico),
+                                                 ('estudantes', indice_estudantes, filtros + grafico[:2])]:
+                    cache.obter((nome, *argumentos), lambda: indice.posicoes(*argumentos))
+    return cache.estatisticas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=1_000_000, help="linhas de notas sintéticas")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--dados", default=None, help="pasta dados_tratados/ a usar no lugar dos dados sintéticos")
+    parser.add_argument("--limite-cache", type=float, default=64, metavar="MB",
+                        help="limite de memória do cache de seleções na simulação")
+    parser.add_argument("--max-entradas", type=int, default=20_000, metavar="N",
+                        help="limite de entradas do cache de seleções na simulação")
+    args = parser.parse_args()
+
+    if args.dados:
+        df, cubo, estudantes = carregar_dados_tratados(args.dados)
+    else:
+        print(f"Gerando {args.linhas:,} linhas sintéticas...")
+        df, cubo, estudantes = gerar_dados_tratados(args.linhas)
+    print(f"base completa: {len(df):,} linhas | cubo: {len(cubo):,} | estudantes: {len(estudantes):,}")
+
+    # índices montados uma vez, como no carregamento do dashboard
+    inicio = time.perf_counter()
+    indice_cubo, indice_estudantes = calc.IndiceHierarquico(cubo), calc.IndiceHierarquico(estudantes)
+    print(f"índices hierárquicos montados em {(time.perf_counter() - inicio) * 1000:,.0f} ms")
+
+    for nome, filtros in matriz_filtros(df):
+        print(f"\nfiltro lateral: {nome} {[f for f in filtros if f not in ('Todas', 'Todos')]}")
+        print(f"{'cálculo':<30} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+        for calculo, funcao in calculos(df, cubo, estudantes, indice_cubo, indice_estudantes, filtros).items():
+            tempos = medir(funcao, args.repeticoes)
+            print(f"{calculo:<30} {np.percentile(tempos, 50):>10.3f} {np.percentile(tempos, 95):>10.3f}")
+        conferidas, empates = conferir_medias(df, indice_cubo, filtros)
+        print(f"médias do cubo iguais às médias exatas das notas: {conferidas} ({empates} empates .xx5)")
+
+    print(f"\ncache de seleções ({args.limite_cache:g} MB, {args.max_entradas:,} entradas), 2 rodadas por todas "
+          "as DIRECs, municípios e escolas:")
+    print(simular_cache(indice_cubo, indice_estudantes, args.limite_cache, rodadas=2, max_entradas=args.max_entradas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Mede cada etapa do processamento_local.py em várias escalas de dados sintéticos.
+
+Para cada escala, gera (ou reaproveita) relatórios do SIGEduc e Censo fictícios com
+`benchmarks.dados_sinteticos` e roda `processar_dados_brutos` sem o cache incremental, num processo
+novo (para que o pico de memória de uma escala não contamine o da outra). Mostra, por etapa, o
+tempo, as linhas processadas por segundo e o pico de memória (RSS). Uso (a partir da raiz do
+repositório):
+
+    python -m benchmarks.etl [--escalas 10000 100000 1000000] [--dados pasta] [--processos N]
+                             [--blocos] [--limite-memoria MB]
+
+Com `--dados`, os arquivos gerados ficam em `pasta/linhas_<escala>` e são reaproveitados nas
+próximas execuções (gerar 10 milhões de linhas leva alguns minutos).
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import processamento_local as pl
+from benchmarks.dados_sinteticos import gerar_dados
+
+
+def preparar_dados(pasta, linhas):
+    """Gera os dados sintéticos de uma escala em `pasta`, se ainda não existirem."""
+    pasta_notas, arquivo_censo = os.path.join(pasta, "notas"), os.path.join(pasta, "censo.xlsx")
+    if not os.path.exists(arquivo_censo):
+        print(f"Gerando {linhas:,} linhas em {pasta}...")
+        gerar_dados(pasta, linhas)
+    return pasta_notas, arquivo_censo
+
+
+def _executar_etl(pasta_notas, arquivo_censo, pasta_saida, opcoes):
+    """Roda o processamento num processo isolado, sem imprimir o resumo, e devolve o relatório."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        relatorio = pl.processar_dados_brutos(pasta=pasta_notas, arquivo_censo=arquivo_censo, pasta_cache=None,
+                                              pasta_saida=pasta_saida, **opcoes)
+    return relatorio.como_dict()
+
+
+def imprimir_relatorio(linhas, relatorio):
+    """Tabela de uma escala: tempo, linhas/s e pico de RSS por etapa."""
+    print(f"\n{linhas:,} linhas")
+    print(f"{'etapa':<22} {'tempo (s)':>10} {'linhas entrada':>15} {'linhas/s':>12} {'pico RSS (MB)':>14}")
+    for etapa in relatorio["etapas"]:
+        # a leitura não tem linhas de entrada: usa as linhas lidas do Excel
+        entrada = etapa["linhas_entrada"] or etapa.get("linhas_lidas_do_excel") or 0
+        por_segundo = f"{entrada / etapa['tempo_s']:,.0f}" if etapa["tempo_s"] > 0 and entrada else "-"
+        pico = f"{etapa['pico_rss_mb']:,.0f}" if etapa["pico_rss_mb"] is not None else "n/d"
+        print(f"{etapa['etapa']:<22} {etapa['tempo_s']:>10.2f} {entrada:>15,} {por_segundo:>12} {pico:>14}")
+
+    leitura = next(e for e in relatorio["etapas"] if e["etapa"] == "leitura")
+    total = relatorio["tempo_total_s"]
+    pico = f"{relatorio['pico_rss_mb']:,.0f}" if relatorio["pico_rss_mb"] is not None else "n/d"
+    print(f"{'total':<22} {total:>10.2f} {linhas:>15,} {linhas / total:>12,.0f} {pico:>14}")
+    if leitura.get("pico_rss_leitores_mb") is not None:
+        print(f"  pico RSS dos processos de leitura: {leitura['pico_rss_leitores_mb']:,.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--escalas", type=int, nargs="+", default=[10_000, 100_000],
+                        help="quantidades de linhas de notas (10 mil a 10 milhões)")
+    parser.add_argument("--dados", default=None, help="pasta para guardar e reaproveitar os dados gerados")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--blocos", action="store_true", help="modo em blocos (filtros aplicados na leitura)")
+    parser.add_argument("--limite-memoria", type=int, default=None, metavar="MB")
+    args = parser.parse_args()
+
+    opcoes = {"n_processos": args.processos, "em_blocos": args.blocos, "limite_memoria_mb": args.limite_memoria}
+    contexto = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as temporaria:
+        pasta_dados = args.dados or temporaria
+        for linhas in args.escalas:
+            pasta_notas, arquivo_censo = preparar_dados(os.path.join(pasta_dados, f"linhas_{linhas}"), linhas)
+            pasta_saida = os.path.join(temporaria, f"saida_{linhas}")
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                relatorio = executor.submit(_executar_etl, pasta_notas, arquivo_censo, pasta_saida, opcoes).result()
+            imprimir_relatorio(linhas, relatorio)
+
+
+if __name__ == "__main__":
+    main()
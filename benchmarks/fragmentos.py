@@ -0,0 +1,117 @@
+"""
+Mede a latência de uma interação com o filtro de um gráfico: página inteira x só a seção (st.fragment).
+
+Cada seção de gráfico das páginas é um st.fragment: mudar o filtro de etapa, série ou componente de
+uma seção executa de novo só a função da seção. Para cada filtro de gráfico, o benchmark troca o
+valor várias vezes e mede (mediana, em milissegundos):
+
+- página inteira: a página executada do início, como antes dos fragmentos (e como ainda acontece
+  ao mudar um filtro lateral);
+- fragmento: só o fragmento da seção do filtro, como o navegador pede ao servidor.
+
+Usa o AppTest do Streamlit sobre os dados de dados_tratados/ (rodar da raiz do repositório, com os
+arquivos gerados pelo processamento_local.py). O AppTest não tem uma forma pública de executar só
+um fragmento: o benchmark pede a execução com a fila de fragmentos (`fragment_id_queue`) preenchida,
+como o servidor faz, e por isso depende de detalhes internos do Streamlit (`RerunData`, o
+`local_script_runner` do AppTest e o `_fragment_storage` do AppTest). Antes de medir, confere a
+versão do Streamlit (VERSOES_TESTADAS) e esses detalhes, e para com um erro se algum não bater. Uso:
+
+    python -m benchmarks.fragmentos [--repeticoes 7]
+"""
+import argparse
+import dataclasses
+import glob
+import os
+import statistics
+import time
+
+import streamlit
+import streamlit.testing.v1.local_script_runner as local_script_runner
+from packaging.version import Version
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest
+
+# (página, key do selectbox, dois valores alternados, posição do fragmento da seção na página)
+INTERACOES = [
+    ("pages/1_*.py", "filtro_etapa_componente", ["Ensino Médio", "Todas"], 0),
+    ("pages/1_*.py", "filtro_etapa_medias_dropdown", ["Ensino Médio", "Todas"], 1),
+    ("pages/1_*.py", "filtro_componente_direc_select", ["Matemática", "Todos"], 2),
+    ("pages/2_*.py", "filtro_etapa_estudante", ["Ensino Médio", "Todas"], 0),
+    ("pages/2_*.py", "filtro_etapa_direc_aprov", ["Ensino Médio", "Todas"], 1),
+]
+
+# versões do Streamlit em que os detalhes internos usados aqui foram conferidos (inclusive)
+VERSOES_TESTADAS = ((1, 65), (1, 65))
+
+# fragmentos a executar na próxima execução do AppTest (vazio: a página inteira)
+_fila_fragmentos = []
+
+
+class _RerunDataFragmentos(RerunData):
+    def __init__(self, **kwargs):
+        if _fila_fragmentos:
+            kwargs.update(fragment_id_queue=list(_fila_fragmentos), is_fragment_scoped_rerun=True)
+        super().__init__(**kwargs)
+
+
+def conferir_streamlit():
+    """Para com RuntimeError se o Streamlit instalado não tiver os detalhes internos de que o benchmark depende."""
+    versao = Version(streamlit.__version__)
+    minima, maxima = VERSOES_TESTADAS
+    if not minima <= (versao.major, versao.minor) <= maxima:
+        raise RuntimeError(f"benchmark conferido com o Streamlit {'.'.join(map(str, minima))} a "
+                           f"{'.'.join(map(str, maxima))}, instalado {versao}: "
+                           "confira RerunData, local_script_runner e AppTest._fragment_storage e atualize "
+                           "VERSOES_TESTADAS")
+    campos = {campo.name for campo in dataclasses.fields(RerunData)}
+    faltando = {"fragment_id_queue", "is_fragment_scoped_rerun"} - campos
+    if faltando:
+        raise RuntimeError(f"RerunData do Streamlit {versao} sem os campos {sorted(faltando)}")
+    if getattr(local_script_runner, "RerunData", None) is not RerunData:
+        raise RuntimeError(f"o local_script_runner do Streamlit {versao} não usa mais RerunData")
+
+
+def medir(pagina, chave, valores, fragmento, repeticoes):
+    """Mediana (ms) das execuções após trocar o selectbox `chave`; `fragmento`=None: página inteira."""
+    app = AppTest.from_file(pagina, default_timeout=300)
+    app.run()
+    # ordem de registro dos fragmentos = ordem das seções na página
+    fragmentos = getattr(getattr(app, "_fragment_storage", None), "_fragments", None)
+    if not isinstance(fragmentos, dict):
+        raise RuntimeError(f"AppTest do Streamlit {streamlit.__version__} sem _fragment_storage._fragments")
+    ids_fragmentos = list(fragmentos)
+    tempos = []
+    for repeticao in range(repeticoes + 1):
+        app.selectbox(key=chave).set_value(valores[repeticao % 2])
+        if fragmento is not None:
+            _fila_fragmentos[:] = [ids_fragmentos[fragmento]]
+        inicio = time.perf_counter()
+        try:
+            app.run()
+        finally:
+            _fila_fragmentos.clear()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if app.exception:
+            raise RuntimeError(app.exception)
+    # a primeira troca preenche os caches da nova seleção: fica de fora
+    return statistics.median(tempos[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=7)
+    args = parser.parse_args()
+
+    conferir_streamlit()
+    local_script_runner.RerunData = _RerunDataFragmentos
+    print(f"{'filtro do gráfico':<32} {'página inteira':>15} {'fragmento':>10}")
+    for padrao, chave, valores, fragmento in INTERACOES:
+        # (o AppTest resolve caminhos relativos a partir deste arquivo)
+        pagina = os.path.abspath(glob.glob(padrao)[0])
+        inteira = medir(pagina, chave, valores, None, args.repeticoes)
+        so_secao = medir(pagina, chave, valores, fragmento, args.repeticoes)
+        print(f"{chave:<32} {inteira:>12.1f} ms {so_secao:>7.1f} ms  ({inteira / so_secao:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compara a leitura dos relatórios do SIGEduc com pd.read_excel e com o leitor em streaming.
+
+Cada leitor roda num processo novo, para que o pico de memória (RSS) de um não contamine o do
+outro. Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.leitura_excel caminho/arquivo1.xlsx [caminho/arquivo2.xlsx ...]
+"""
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import processamento_local as pl
+
+
+def _medir_leitura(arquivos, leitor):
+    """Lê os arquivos num processo isolado e devolve (segundos, linhas, MB do DataFrame, pico RSS em MB)."""
+    pico_inicial = pl.pico_memoria_mb()
+    inicio = time.perf_counter()
+    dfs = [pl.processar_arquivo_notas(arquivo, leitor=leitor) for arquivo in arquivos]
+    segundos = time.perf_counter() - inicio
+    linhas = sum(len(df) for df in dfs)
+    memoria_df = sum(df.memory_usage(deep=True).sum() for df in dfs) / 2**20
+    return segundos, linhas, memoria_df, pico_inicial, pl.pico_memoria_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("arquivos", nargs="+", help="arquivos .xlsx exportados do SIGEduc")
+    args = parser.parse_args()
+
+    contexto = multiprocessing.get_context("spawn")
+    print(f"{'leitor':<10} {'tempo (s)':>10} {'linhas':>10} {'df (MB)':>10} {'RSS base (MB)':>14} {'pico RSS (MB)':>14}")
+    for leitor in ("pandas", "openpyxl"):
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            segundos, linhas, memoria_df, base, pico = executor.submit(_medir_leitura, args.arquivos, leitor).result()
+        base = f"{base:.0f}" if base is not None else "n/d"
+        pico = f"{pico:.0f}" if pico is not None else "n/d"
+        print(f"{leitor:<10} {segundos:>10.2f} {linhas:>10,} {memoria_df:>10.1f} {base:>14} {pico:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Micro-benchmark do valor mais frequente por estudante (DIREC, SÉRIE e escola de cada CPF x etapa).
+
+Compara o `groupby().agg(lambda x: x.mode().iloc[0] ...)` que a página 2 usava, com duas chamadas
+de `Series.mode()` por estudante, com `pl.valor_mais_frequente` (ordenação + contagem de
+sequências iguais em `pl.moda_por_grupo`). Os registros sintéticos têm poucos valores possíveis
+por estudante, para que haja muitos empates, categorias fora da ordem alfabética e valores vazios;
+confere que os resultados (e o desempate pelo menor valor) são idênticos. Também confere que, na
+tabela de estudantes, um estudante transferido fica com a DIREC mais frequente e com o município e
+a escola mais frequentes dessa DIREC (os quatro de uma mesma escola, mesmo com empates). Uso:
+
+    python -m benchmarks.moda_por_grupo [--linhas 200000] [--repeticoes 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import processamento_local as pl
+
+
+def gerar_registros(linhas, seed=0):
+    """Registros estudante x componente com ~8 linhas por CPF x etapa e DIREC/SÉRIE/INEP sorteados."""
+    rng = np.random.default_rng(seed)
+    cpfs = rng.integers(0, max(linhas // 16, 1), linhas)
+
+    def sortear(valores, vazios=0.03):
+        codigos = rng.integers(0, len(valores), linhas)
+        codigos[rng.random(linhas) < vazios] = -1
+        return codigos
+
+    # categorias fora da ordem alfabética: o desempate segue a ordem das categorias
+    return pd.DataFrame({
+        "CPF PESSOA": pd.array([f"{c:011d}" for c in cpfs], dtype="string"),
+        "ETAPA_RESUMIDA": pd.Categorical.from_codes(sortear(["Ens. Fund. - Anos Finais", "Ensino Médio"], 0),
+                                                    ["Ens. Fund. - Anos Finais", "Ensino Médio"]),
+        "DIREC": pd.Categorical.from_codes(sortear(range(3)), ["03ª DIREC", "01ª DIREC", "02ª DIREC"]),
+        "SÉRIE": pd.Categorical.from_codes(sortear(range(4)), ["6º ANO", "7º ANO", "1ª SÉRIE", "2ª SÉRIE"]),
+        "INEP ESCOLA": pd.array(np.where(sortear(range(3)) < 0, pd.NA, 24000000 + rng.integers(0, 3, linhas)),
+                                dtype="UInt32"),
+    })
+
+
+def moda_anterior(df, coluna):
+    """Como era feito na página: `Series.mode()` por estudante (grupos sem nenhum valor ficam de fora)."""
+    modas = df.groupby(pl.COLUNAS_ESTUDANTE, observed=True)[coluna].agg(
+        lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[0])
+    return modas.dropna().reset_index().astype({coluna: df[coluna].dtype})
+
+
+def registros_estudante(escolas):
+    """
+    Registros de um estudante em várias escolas: `escolas` é uma lista de (DIREC, MUNICÍPIO, INEP,
+    ESCOLA, quantidade de registros), com INEP None para registros sem Inep.
+    """
+    linhas = [escola[:4] for escola in escolas for _ in range(escola[4])]
+    direc, municipio, inep, escola = zip(*linhas)
+    return pd.DataFrame({
+        "CPF PESSOA": pd.array(["00000000001"] * len(linhas), dtype="string"),
+        "ETAPA_RESUMIDA": pd.Categorical(["Ensino Médio"] * len(linhas)),
+        "DIREC": pd.Categorical(direc),
+        "MUNICÍPIO": pd.array(municipio, dtype="string"),
+        "INEP ESCOLA": pd.array(inep, dtype="UInt32"),
+        "ESCOLA": pd.array(escola, dtype="string"),
+        "SÉRIE": pd.Categorical(["1ª SÉRIE"] * len(linhas)),
+        "STATUS": (["Aprovado", "Reprovado", "Sem nota"] * len(linhas))[:len(linhas)],
+    })
+
+
+def conferir_transferencias():
+    """
+    Em `pl.montar_tabela_estudantes`, a DIREC é a mais frequente do estudante e o município e a escola
+    são os mais frequentes dessa DIREC (os quatro de uma mesma escola, mesmo com empates).
+    """
+    natal = ("01ª DIREC - NATAL", "NATAL", 24000002, "ESCOLA A")
+    natal_sem_inep = ("01ª DIREC - NATAL", "NATAL", None, "ESCOLA A")
+    parnamirim = ("02ª DIREC - PARNAMIRIM", "PARNAMIRIM", 24000001, "ESCOLA B")
+    macaiba = ("02ª DIREC - PARNAMIRIM", "MACAÍBA", 24000003, "ESCOLA C")
+    casos = [
+        # empate entre DIRECs: a primeira DIREC, com a sua escola (e não o Inep da outra)
+        ([(*natal, 2), (*parnamirim, 2)], natal),
+        # a única escola com Inep é da outra DIREC: fica o local sem Inep da DIREC mais frequente
+        ([(*natal_sem_inep, 2), (*parnamirim, 2)], natal_sem_inep),
+        # a escola mais frequente (3) é da 01ª, mas a DIREC mais frequente é a 02ª (2 + 2)
+        ([(*natal, 3), (*parnamirim, 2), (*macaiba, 2)], macaiba),
+    ]
+    for escolas, esperado in casos:
+        estudante = pl.montar_tabela_estudantes(registros_estudante(escolas)).iloc[0]
+        obtido = tuple(None if pd.isna(valor) else valor
+                       for valor in estudante[["DIREC", "MUNICÍPIO", "INEP ESCOLA", "ESCOLA"]])
+        assert obtido == esperado, (escolas, obtido)
+        registros = sum(escola[4] for escola in escolas)
+        assert estudante["QTD_REPROVACOES"] == (registros + 1) // 3
+        assert estudante["QTD_COMPONENTES_COM_NOTA"] == registros - registros // 3
+
+
+def medir(funcao, repeticoes):
+    """Menor tempo entre as repetições e o último resultado."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    df = gerar_registros(args.linhas)
+    print(f"{args.linhas:,} registros, {df.groupby(pl.COLUNAS_ESTUDANTE, observed=True).ngroups:,} estudantes x etapa")
+    for coluna in ["DIREC", "SÉRIE", "INEP ESCOLA"]:
+        t_anterior, anterior = medir(lambda: moda_anterior(df, coluna), 1)
+        t_novo, novo = medir(lambda: pl.valor_mais_frequente(df, pl.COLUNAS_ESTUDANTE, coluna), args.repeticoes)
+        pd.testing.assert_frame_equal(anterior, novo)
+        print(f"  {coluna:<12} mode() por grupo: {t_anterior:8.3f} s | moda_por_grupo: {t_novo:8.3f} s"
+              f"  ({t_anterior / t_novo:.0f}x)")
+    print("  resultados idênticos (incluindo os empates)")
+    conferir_transferencias()
+    print("  transferências: DIREC mais frequente, com município e escola da mesma DIREC")
+
+
+if __name__ == "__main__":
+    main()
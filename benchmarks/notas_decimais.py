@@ -0,0 +1,74 @@
+"""
+Micro-benchmark da conversão das notas com vírgula decimal ("7,5") para número.
+
+Compara o laço anterior (um `.str.replace` + `pd.to_numeric` por coluna, seguido da conversão
+para float32 que o `otimizar_tipos` fazia) com `converter_notas`, que converte as 8 colunas de
+uma vez. Também confere que os dois resultados são idênticos, inclusive nos NaN. Uso:
+
+    python -m benchmarks.notas_decimais [--linhas 1000000] [--repeticoes 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import processamento_local as pl
+
+
+def gerar_notas(linhas, seed=0):
+    """DataFrame com as 8 colunas de notas como texto, com vazios e alguns valores inválidos."""
+    rng = np.random.default_rng(seed)
+    dados = {}
+    for col in pl.COLUNAS_NOTAS:
+        notas = np.round(rng.uniform(0, 10, linhas), 1).astype(str)
+        valores = np.char.replace(notas, ".", ",").astype(object)
+        sorteio = rng.random(linhas)
+        valores[sorteio < 0.20] = None        # nota não lançada
+        valores[(sorteio >= 0.20) & (sorteio < 0.21)] = ""
+        valores[(sorteio >= 0.21) & (sorteio < 0.215)] = "-"
+        dados[col] = pd.Series(valores).astype("str")
+    return pd.DataFrame(dados)
+
+
+def converter_notas_anterior(df):
+    """Conversão como era feita antes, coluna a coluna."""
+    for col in pl.COLUNAS_NOTAS:
+        if col in df.columns:
+            df[col] = df[col].str.replace(",", ".")
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+            df[col] = df[col].astype("float32")
+    return df
+
+
+def medir(funcao, df, repeticoes):
+    """Menor tempo entre as repetições (cada uma sobre uma cópia do DataFrame) e o último resultado."""
+    tempos = []
+    for _ in range(repeticoes):
+        copia = df.copy()
+        inicio = time.perf_counter()
+        resultado = funcao(copia)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    df = gerar_notas(args.linhas)
+    t_anterior, anterior = medir(converter_notas_anterior, df, args.repeticoes)
+    t_novo, novo = medir(pl.converter_notas, df, args.repeticoes)
+
+    pd.testing.assert_frame_equal(anterior, novo)
+
+    print(f"{args.linhas:,} linhas x {len(pl.COLUNAS_NOTAS)} colunas de notas")
+    print(f"  laço por coluna : {t_anterior:8.3f} s")
+    print(f"  converter_notas : {t_novo:8.3f} s  ({t_anterior / t_novo:.1f}x)")
+    print("  resultados idênticos (incluindo NaN)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compara a saída em arquivo Parquet único (snappy) com o dataset particionado por etapa/DIREC (zstd).
+
+Regrava os dados tratados nos dois formatos numa pasta temporária e mede o tamanho em disco, a
+leitura completa e a leitura filtrada por DIREC, por município e por escola (usando `filters=`
+do `pd.read_parquet`, que é o que permite pular partições e grupos de linhas). Uso:
+
+    python -m benchmarks.saida_parquet [dados_tratados/df_EF_EM_bncc_censo.parquet] [--repeticoes 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import processamento_local as pl
+
+
+def tamanho_mb(caminho):
+    """Tamanho de um arquivo ou da soma dos arquivos de uma pasta, em MB."""
+    if os.path.isfile(caminho):
+        return os.path.getsize(caminho) / 2**20
+    return sum(os.path.getsize(os.path.join(raiz, nome))
+               for raiz, _, nomes in os.walk(caminho) for nome in nomes) / 2**20
+
+
+def medir_leitura(caminho, filtros, repeticoes):
+    """Menor tempo de leitura entre as repetições e a quantidade de linhas lidas."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        df = pd.read_parquet(caminho, filters=filtros)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("arquivo", nargs="?", default=os.path.join(pl.PASTA_SAIDA, "df_EF_EM_bncc_censo.parquet"))
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    df = pd.read_parquet(args.arquivo)
+
+    # valores mais frequentes, para os filtros não serem triviais
+    direc = df["DIREC"].value_counts().index[0]
+    municipio = df["MUNICÍPIO"].value_counts().index[0]
+    inep = df["INEP ESCOLA"].value_counts().index[0]
+    # o dashboard sempre sabe a DIREC do município/escola selecionado (os filtros são em cascata),
+    # então as consultas "+ DIREC" são as que ele faria; as outras mostram o filtro isolado
+    direc_municipio = df.loc[df["MUNICÍPIO"] == municipio, "DIREC"].unique().tolist()
+    direc_escola = df.loc[df["INEP ESCOLA"] == inep, "DIREC"].unique().tolist()
+    consultas = {
+        "completa": None,
+        "DIREC": [("DIREC", "==", direc)],
+        "município": [("MUNICÍPIO", "==", municipio)],
+        "município + DIREC": [("DIREC", "in", direc_municipio), ("MUNICÍPIO", "==", municipio)],
+        "escola": [("INEP ESCOLA", "==", inep)],
+        "escola + DIREC": [("DIREC", "in", direc_escola), ("INEP ESCOLA", "==", inep)],
+    }
+
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo_unico = os.path.join(pasta, "df_EF_EM_bncc_censo.parquet")
+        pasta_dataset = os.path.join(pasta, "df_EF_EM_bncc_censo")
+
+        inicio = time.perf_counter()
+        df.to_parquet(arquivo_unico, compression="snappy")
+        escrita_unico = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        pl.salvar_parquet_particionado(df, pasta_dataset)
+        escrita_dataset = time.perf_counter() - inicio
+
+        print(f"{len(df):,} linhas")
+        print(f"{'':<40} {'arquivo único':>16} {'particionado':>16}")
+        print(f"{'tamanho (MB)':<40} {tamanho_mb(arquivo_unico):>16.2f} {tamanho_mb(pasta_dataset):>16.2f}")
+        print(f"{'escrita (s)':<40} {escrita_unico:>16.3f} {escrita_dataset:>16.3f}")
+        for nome, filtros in consultas.items():
+            t_unico, n_unico = medir_leitura(arquivo_unico, filtros, args.repeticoes)
+            t_dataset, n_dataset = medir_leitura(pasta_dataset, filtros, args.repeticoes)
+            assert n_unico == n_dataset, (nome, n_unico, n_dataset)
+            print(f"{'leitura ' + nome + ' (s)':<40} {t_unico:>16.3f} {t_dataset:>16.3f}   ({n_unico:,} linhas)")
+
+
+if __name__ == "__main__":
+    main()
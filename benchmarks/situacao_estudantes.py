@@ -0,0 +1,82 @@
+"""
+Micro-benchmark da classificação dos estudantes (Aprovado/Reprovado) da página 2.
+
+Compara o `apply` linha a linha que a página fazia (`definir_situacao_estudante`, uma chamada de
+função Python por estudante) com `calc.classificar_situacao`, que aplica a tabela de limites por
+etapa (`calc.LIMITES_REPROVACOES`) de uma vez. Também confere que as duas situações são idênticas
+em todas as linhas, incluindo etapas vazias e os casos no limite (3/4 e 6/7 reprovações). Uso:
+
+    python -m benchmarks.situacao_estudantes [--linhas 1000000] [--repeticoes 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import calculos_dashboard as calc
+from esquema_dados import CATEGORIAS_ETAPA_RESUMIDA
+
+
+def gerar_estudantes(linhas, seed=0):
+    """ETAPA_RESUMIDA (com ~1% vazias) e TOTAL_REPROVACOES de 0 a 12, como na tabela de estudantes."""
+    rng = np.random.default_rng(seed)
+    codigos = rng.integers(0, len(CATEGORIAS_ETAPA_RESUMIDA), linhas)
+    codigos[rng.random(linhas) < 0.01] = -1
+    return pd.DataFrame({
+        'ETAPA_RESUMIDA': pd.Categorical.from_codes(codigos, CATEGORIAS_ETAPA_RESUMIDA),
+        'TOTAL_REPROVACOES': rng.integers(0, 13, linhas).astype('int16'),
+    })
+
+
+def definir_situacao_estudante(row):
+    """Regra como era feita antes na página, uma linha por vez."""
+    if row['ETAPA_RESUMIDA'] == "Ens. Fund. - Anos Finais":
+        return 'Reprovado' if row['TOTAL_REPROVACOES'] >= 4 else 'Aprovado'
+    elif row['ETAPA_RESUMIDA'] == "Ensino Médio":
+        return 'Reprovado' if row['TOTAL_REPROVACOES'] >= 7 else 'Aprovado'
+    else:
+        return 'Indefinido'
+
+
+def situacao_anterior(df):
+    return df.apply(definir_situacao_estudante, axis=1)
+
+
+def situacao_vetorizada(df):
+    return calc.classificar_situacao(df['ETAPA_RESUMIDA'], df['TOTAL_REPROVACOES'])
+
+
+def medir(funcao, df, repeticoes):
+    """Menor tempo entre as repetições e o último resultado."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(df)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    df = gerar_estudantes(args.linhas)
+    t_anterior, anterior = medir(situacao_anterior, df, args.repeticoes)
+    t_novo, novo = medir(situacao_vetorizada, df, args.repeticoes)
+
+    pd.testing.assert_series_equal(anterior, novo.astype(str))
+    # etapa como texto (e não category) e tabela vazia dão o mesmo resultado
+    pd.testing.assert_series_equal(anterior, situacao_vetorizada(df.astype({'ETAPA_RESUMIDA': object})).astype(str))
+    assert situacao_vetorizada(df.iloc[:0]).empty
+
+    print(f"{args.linhas:,} estudantes x etapa")
+    print(f"  apply por linha      : {t_anterior:8.3f} s")
+    print(f"  classificar_situacao : {t_novo:8.3f} s  ({t_anterior / t_novo:.0f}x)")
+    print(f"  situações idênticas: {anterior.value_counts().to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,691 @@
+# Cálculos do dashboard, sem Streamlit: as páginas chamam estas funções (com o cache do Streamlit
+# por cima) e o benchmark benchmarks/dashboard.py as mede fora do navegador.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# FILTROS LATERAIS (DIREC -> Município -> Escola)
+# A escola é escolhida pelo código INEP (inteiro); o rótulo "NOME (cód. Inep: 12345678)" mostrado no
+# filtro fica só no dicionário de escolas, uma vez por escola, e não numa coluna de cada linha.
+
+def formatar_escola(df):
+    """Rótulo da escola usado no filtro lateral: "NOME (cód. Inep: 12345678)"."""
+    return df['ESCOLA'].astype(str) + " (cód. Inep: " + df['INEP ESCOLA'].astype(str) + ")"
+
+
+def montar_dicionario_escolas(df):
+    """
+    Dicionário das escolas de `df`: uma linha por código INEP (a primeira em que ele aparece).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexado pelo INEP ESCOLA (int), com ESCOLA, ROTULO (o texto do filtro lateral), DIREC e
+        MUNICÍPIO, em ordem de rótulo.
+    """
+    escolas = df.loc[df['INEP ESCOLA'].notna(), ['INEP ESCOLA', 'ESCOLA', 'DIREC', 'MUNICÍPIO']]
+    escolas = escolas.drop_duplicates('INEP ESCOLA')
+    escolas = escolas.assign(ROTULO=formatar_escola(escolas), **{'INEP ESCOLA': escolas['INEP ESCOLA'].astype('int64')})
+    return escolas.set_index('INEP ESCOLA')[['ESCOLA', 'ROTULO', 'DIREC', 'MUNICÍPIO']].sort_values('ROTULO')
+
+
+def opcoes_direc(df):
+    return ['Todas'] + sorted(df['DIREC'].dropna().unique().tolist())
+
+
+def opcoes_municipio(df, direc):
+    if direc != 'Todas':
+        df = df[df['DIREC'] == direc]
+    return ['Todos'] + sorted(df['MUNICÍPIO'].dropna().unique().tolist())
+
+
+def opcoes_escola(df, direc, municipio):
+    """'Todas' e os códigos INEP das escolas da DIREC/município, em ordem de rótulo."""
+    if direc != 'Todas':
+        df = df[df['DIREC'] == direc]
+    if municipio != 'Todos':
+        df = df[df['MUNICÍPIO'] == municipio]
+    return ['Todas'] + montar_dicionario_escolas(df).index.tolist()
+
+
+def aplicar_filtros(df, direc, municipio, escola):
+    """
+    Aplica os filtros laterais (`escola` é 'Todas' ou o código INEP da escola).
+
+    `df` não é alterado (pode ser o DataFrame compartilhado entre as sessões do dashboard).
+    """
+    if direc != 'Todas':
+        df = df[df['DIREC'] == direc]
+
+    if municipio != 'Todos':
+        df = df[df['MUNICÍPIO'] == municipio]
+
+    if escola != 'Todas':
+        df = df[df['INEP ESCOLA'] == escola]
+
+    return df
+
+
+# colunas da hierarquia dos filtros laterais, na ordem em que as linhas são agrupadas
+COLUNAS_HIERARQUIA = ['DIREC', 'MUNICÍPIO', 'INEP ESCOLA']
+
+# ordem das linhas do índice: a hierarquia e o nome da escola (que só desempata as linhas sem INEP,
+# já que cada INEP tem um único nome), a mesma ordem do cubo
+COLUNAS_ORDEM_INDICE = COLUNAS_HIERARQUIA + ['ESCOLA']
+
+# valor de cada nível que não filtra nada
+TODOS_HIERARQUIA = ('Todas', 'Todos', 'Todas')
+
+# colunas dos selectboxes dos gráficos, com as opções no catálogo do índice (`opcoes_grafico`)
+COLUNAS_OPCOES = ['ETAPA_RESUMIDA', 'SÉRIE', 'COMPONENTE CURRICULAR']
+
+
+class IndiceHierarquico:
+    """
+    Índice DIREC -> Município -> Escola dos filtros laterais, montado uma vez quando os dados são carregados.
+
+    As linhas são ordenadas por DIREC, MUNICÍPIO, INEP ESCOLA e ESCOLA, então cada DIREC, cada
+    município e cada escola ocupa um intervalo contíguo de linhas. `selecionar` devolve o intervalo do nó
+    escolhido como uma fatia (`iloc[inicio:fim]`, sem copiar os dados), sem percorrer a tabela. O
+    resultado é o mesmo de `aplicar_filtros`. As opções dos filtros laterais e dos selectboxes dos
+    gráficos vêm de um catálogo montado junto com o índice (ver `_montar_catalogo`), sem `unique`
+    nem ordenação a cada execução das páginas.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        Dados na ordem do índice (o próprio DataFrame recebido, se já estiver ordenado, como o cubo).
+    intervalos : dict
+        Para cada nível ('direc', 'municipio', 'escola'), chave do nó -> (início, fim) das linhas.
+        As chaves são (DIREC,), (DIREC, MUNICÍPIO) e (DIREC, MUNICÍPIO, INEP ESCOLA), com None
+        no lugar de valores vazios.
+    escolas : pandas.DataFrame
+        Dicionário das escolas (ver `montar_dicionario_escolas`).
+    rotulos : dict
+        Código INEP -> rótulo da escola no filtro lateral.
+    """
+
+    def __init__(self, df):
+        # códigos na ordem dos valores, com os vazios no fim (como no sort_values)
+        codigos = []
+        for coluna in [coluna for coluna in COLUNAS_ORDEM_INDICE if coluna in df.columns]:
+            codigos_coluna, valores = pd.factorize(df[coluna], sort=True)
+            codigos.append(np.where(codigos_coluna < 0, len(valores), codigos_coluna))
+        ordem = np.lexsort(codigos[::-1])
+        if (ordem != np.arange(len(df))).any():
+            df = df.take(ordem)
+            codigos = [c[ordem] for c in codigos]
+        self.df = df
+
+        # início de cada nó: linhas em que muda a DIREC, o município ou a escola
+        mudanca_direc = codigos[0][1:] != codigos[0][:-1]
+        mudanca_municipio = mudanca_direc | (codigos[1][1:] != codigos[1][:-1])
+        mudanca_escola = mudanca_municipio | (codigos[2][1:] != codigos[2][:-1])
+
+        self.intervalos = {}
+        self._numeros, self._limites = {}, {}
+        inicios_niveis = []
+        niveis = [('direc', mudanca_direc), ('municipio', mudanca_municipio), ('escola', mudanca_escola)]
+        for profundidade, (nivel, mudanca) in enumerate(niveis, start=1):
+            inicios = np.flatnonzero(np.r_[True, mudanca]) if len(df) else np.array([], dtype=np.intp)
+            fins = np.r_[inicios[1:], len(df)]
+            primeiras = df.iloc[inicios]
+            colunas = [primeiras[coluna].tolist() for coluna in COLUNAS_HIERARQUIA[:profundidade]]
+            chaves = zip(*[[None if pd.isna(valor) else valor for valor in coluna] for coluna in colunas])
+            self.intervalos[nivel] = {chave: (int(inicio), int(fim)) for chave, inicio, fim in zip(chaves, inicios, fins)}
+            # número de cada nó na ordem dos intervalos (linha do nó nas matrizes de presença)
+            self._numeros[nivel] = {chave: numero for numero, chave in enumerate(self.intervalos[nivel])}
+            self._limites[nivel] = list(self.intervalos[nivel].values())
+            inicios_niveis.append(inicios)
+
+        # dicionário das escolas, a partir da primeira linha de cada escola
+        self.escolas = montar_dicionario_escolas(primeiras)
+        self.rotulos = self.escolas['ROTULO'].to_dict()
+        self._montar_catalogo(inicios_niveis)
+
+    def _montar_catalogo(self, inicios_niveis):
+        """
+        Catálogo das opções dos filtros, montado uma vez com os dados (as opções saem dele por consulta).
+
+        - Filtros laterais: as listas de DIRECs, de municípios de cada DIREC e de escolas de cada
+          DIREC/município (também com 'Todas'/'Todos'), a partir das chaves da hierarquia.
+        - Filtros dos gráficos (COLUNAS_OPCOES presentes em `df`): os valores da coluna (o dicionário
+          da categoria) em ordem alfabética e, para cada nível, uma matriz de presença nós x valores.
+          A matriz das escolas marca os códigos das linhas de cada escola; as dos municípios e das
+          DIRECs juntam (ou lógico) as escolas de cada nó, que são consecutivas.
+        """
+        direcs = sorted(direc for direc, in self.intervalos['direc'] if direc is not None)
+        municipios = {'Todas': set()}
+        escolas = {('Todas', 'Todos'): set()}
+        for direc, municipio, escola in self.intervalos['escola']:
+            if municipio is not None:
+                for d in ('Todas', direc):
+                    municipios.setdefault(d, set()).add(municipio)
+            if escola is not None:
+                for d, m in [('Todas', 'Todos'), (direc, 'Todos'), ('Todas', municipio), (direc, municipio)]:
+                    escolas.setdefault((d, m), set()).add(escola)
+        self._opcoes_laterais = {
+            'direc': ['Todas'] + direcs,
+            'municipio': {d: ['Todos'] + sorted(m) for d, m in municipios.items()},
+            'escola': {chave: ['Todas'] + sorted(e, key=self.rotulos.__getitem__) for chave, e in escolas.items()},
+        }
+
+        # nó (escola) de cada linha e primeira escola de cada DIREC e de cada município
+        inicios_escola = inicios_niveis[2]
+        no_escola = np.repeat(np.arange(len(inicios_escola)), np.diff(np.r_[inicios_escola, len(self.df)]))
+        primeiras_escolas = {nivel: np.searchsorted(inicios_escola, inicios)
+                             for nivel, inicios in zip(['direc', 'municipio'], inicios_niveis)}
+        self._presenca = {}
+        for coluna in COLUNAS_OPCOES:
+            if coluna not in self.df.columns:
+                continue
+            codigos, valores = pd.factorize(self.df[coluna])
+            valores = valores.tolist()
+            alfabetica = sorted(range(len(valores)), key=valores.__getitem__)
+            presenca = np.zeros((len(inicios_escola), len(valores)), dtype=bool)
+            validos = codigos >= 0
+            presenca[no_escola[validos], codigos[validos]] = True
+            presenca = presenca[:, alfabetica]
+            matrizes = {'escola': presenca}
+            for nivel, primeiras in primeiras_escolas.items():
+                matrizes[nivel] = (np.logical_or.reduceat(presenca, primeiras, axis=0) if len(primeiras)
+                                   else presenca[:0])
+            matrizes['todas'] = presenca.any(axis=0)
+            self._presenca[coluna] = ([valores[i] for i in alfabetica], matrizes)
+
+    def _nos(self, direc, municipio, escola):
+        """
+        Nível mais baixo selecionado e números dos seus nós ('Todas'/'Todos' aceitam qualquer valor).
+
+        Returns
+        -------
+        tuple of (str, list of int)
+            Nível ('direc', 'municipio' ou 'escola') e números dos nós, na ordem dos intervalos.
+        """
+        filtro = (direc, municipio, escola)
+        profundidade = 2 if escola != 'Todas' else 1 if municipio != 'Todos' else 0
+        nivel = ['direc', 'municipio', 'escola'][profundidade]
+        numeros = self._numeros[nivel]
+        filtro, todos = filtro[:profundidade + 1], TODOS_HIERARQUIA[:profundidade + 1]
+        if all(f != t for f, t in zip(filtro, todos)):
+            return nivel, [numeros[filtro]] if filtro in numeros else []
+        return nivel, [numero for chave, numero in numeros.items()
+                       if all(f == t or f == c for f, t, c in zip(filtro, todos, chave))]
+
+    def posicoes(self, direc, municipio, escola, etapa='Todas', serie='Todas', componente='Todos'):
+        """
+        Posições em `df` das linhas dos filtros laterais e dos filtros de gráfico (ver `filtrar_grafico`).
+
+        Returns
+        -------
+        slice or numpy.ndarray
+            Um `slice` quando as linhas são contíguas, senão as posições (int32).
+        """
+        if (direc, municipio, escola) == TODOS_HIERARQUIA:
+            selecao = slice(0, len(self.df))
+        else:
+            nivel, nos = self._nos(direc, municipio, escola)
+            intervalos = [self._limites[nivel][no] for no in nos]
+            if len(intervalos) == 1:
+                selecao = slice(*intervalos[0])
+            else:
+                # nenhum ou vários nós (por exemplo, um município escolhido com DIREC 'Todas')
+                selecao = compactar_posicoes(np.concatenate(
+                    [np.arange(inicio, fim, dtype=np.int32) for inicio, fim in intervalos] or [np.array([], dtype=np.int32)]))
+        if (etapa, serie, componente) == ('Todas', 'Todas', 'Todos'):
+            return selecao
+        linhas = np.arange(selecao.start, selecao.stop, dtype=np.int32) if isinstance(selecao, slice) else selecao
+        return compactar_posicoes(linhas[mascara_grafico(self.df.iloc[selecao], etapa, serie, componente)])
+
+    def selecionar(self, direc, municipio, escola, etapa='Todas', serie='Todas', componente='Todos'):
+        """Linhas dos filtros: uma fatia de `df` (sem cópia) quando a seleção é contígua."""
+        return self.df.iloc[self.posicoes(direc, municipio, escola, etapa, serie, componente)]
+
+    def opcoes_direc(self):
+        return list(self._opcoes_laterais['direc'])
+
+    def opcoes_municipio(self, direc):
+        return list(self._opcoes_laterais['municipio'].get(direc, ['Todos']))
+
+    def opcoes_escola(self, direc, municipio):
+        """'Todas' e os códigos INEP das escolas da DIREC/município, em ordem de rótulo."""
+        return list(self._opcoes_laterais['escola'].get((direc, municipio), ['Todas']))
+
+    def opcoes_grafico(self, direc, municipio, escola, coluna, todos='Todas'):
+        """
+        Opções de um selectbox de gráfico para os filtros laterais, consultadas no catálogo: o mesmo
+        resultado de `opcoes_coluna(self.selecionar(direc, municipio, escola), coluna, todos)`.
+        """
+        valores, matrizes = self._presenca[coluna]
+        if (direc, municipio, escola) == TODOS_HIERARQUIA:
+            presentes = matrizes['todas']
+        else:
+            nivel, nos = self._nos(direc, municipio, escola)
+            presentes = matrizes[nivel][nos].any(axis=0)
+        return [todos] + [valor for valor, presente in zip(valores, presentes) if presente]
+
+
+# FILTROS DE CADA GRÁFICO
+
+def opcoes_coluna(df, coluna, todos='Todas'):
+    """Opções de um selectbox de gráfico: `todos` mais os valores presentes em `coluna`, em ordem alfabética."""
+    return [todos] + sorted(df[coluna].dropna().unique().tolist())
+
+
+def mascara_grafico(df, etapa='Todas', serie='Todas', componente='Todos'):
+    """Máscara (numpy) dos filtros de etapa, série e componente dos gráficos ('Todas'/'Todos' não filtram)."""
+    mascara = np.ones(len(df), dtype=bool)
+    for coluna, valor, todos in [('ETAPA_RESUMIDA', etapa, 'Todas'), ('SÉRIE', serie, 'Todas'),
+                                 ('COMPONENTE CURRICULAR', componente, 'Todos')]:
+        if valor != todos:
+            mascara &= (df[coluna] == valor).to_numpy(dtype=bool, na_value=False)
+    return mascara
+
+
+def filtrar_grafico(df, etapa='Todas', serie='Todas', componente='Todos'):
+    """Filtros de etapa, série e componente dos gráficos ('Todas'/'Todos' não filtram)."""
+    if (etapa, serie, componente) == ('Todas', 'Todas', 'Todos'):
+        return df
+    return df[mascara_grafico(df, etapa, serie, componente)]
+
+
+def compactar_posicoes(posicoes):
+    """Troca posições consecutivas (crescentes) por um `slice`, que seleciona sem copiar."""
+    if len(posicoes) == 0:
+        return slice(0, 0)
+    if posicoes[-1] - posicoes[0] + 1 == len(posicoes):
+        return slice(int(posicoes[0]), int(posicoes[-1]) + 1)
+    return posicoes
+
+
+# memória estimada de cada entrada de um cache LRU além do valor guardado: a chave (tupla com os
+# filtros e a impressão digital dos dados), o nó do OrderedDict e um `slice` (medido: ~350 bytes)
+CUSTO_ENTRADA_BYTES = 512
+
+
+class CacheLRU:
+    """
+    Cache LRU limitado pela memória que ocupa (e, opcionalmente, pelo número de entradas).
+
+    Cada entrada conta `CUSTO_ENTRADA_BYTES` mais o tamanho do valor guardado (`tamanho`, que as
+    subclasses definem para o tipo de valor que guardam). Quando a memória ocupada passa de
+    `limite_bytes`, ou as entradas passam de `max_entradas`, as entradas usadas há mais tempo são
+    descartadas, uma a uma. É compartilhado pelas sessões do dashboard (threads), então o acesso é
+    protegido por uma trava. Os valores guardados são compartilhados e não devem ser alterados.
+
+    Attributes
+    ----------
+    acertos, faltas, descartes : int
+        Quantidade de consultas encontradas no cache, de consultas calculadas e de entradas descartadas.
+    """
+
+    def __init__(self, limite_bytes, max_entradas=None):
+        self.limite_bytes = limite_bytes
+        self.max_entradas = max_entradas
+        self.bytes = 0
+        self.acertos = self.faltas = self.descartes = 0
+        # chave -> (valor, bytes contados para a entrada)
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+
+    @staticmethod
+    def tamanho(valor):
+        """Memória (bytes) de um valor, além do custo da entrada (0: só o custo da entrada)."""
+        return 0
+
+    def obter(self, chave, calcular, tamanho=None):
+        """
+        Valor de `chave`; se não estiver no cache, é calculado com `calcular()` e guardado.
+
+        `tamanho` (bytes), se informado, é usado no lugar de `self.tamanho(valor)`, para quem já sabe
+        estimar o tamanho do valor sem examiná-lo.
+        """
+        with self._trava:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave][0]
+            self.faltas += 1
+
+        valor = calcular()
+        tamanho = CUSTO_ENTRADA_BYTES + (self.tamanho(valor) if tamanho is None else tamanho)
+        with self._trava:
+            if chave not in self._entradas and tamanho <= self.limite_bytes:
+                self._entradas[chave] = (valor, tamanho)
+                self.bytes += tamanho
+                while self.bytes > self.limite_bytes or (self.max_entradas is not None
+                                                         and len(self._entradas) > self.max_entradas):
+                    _, (_, tamanho_descartada) = self._entradas.popitem(last=False)
+                    self.bytes -= tamanho_descartada
+                    self.descartes += 1
+        return valor
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.faltas
+            return {
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'descartes': self.descartes,
+                'taxa_acertos': round(self.acertos / consultas, 3) if consultas else None,
+                'entradas': len(self._entradas),
+                'memoria_mb': round(self.bytes / 2**20, 2),
+                'limite_mb': round(self.limite_bytes / 2**20, 2),
+                'max_entradas': self.max_entradas,
+            }
+
+
+class CacheSelecoes(CacheLRU):
+    """
+    Cache LRU das seleções de linhas dos filtros (ver `CacheLRU`).
+
+    Guarda, para cada combinação de filtros, só as linhas selecionadas (um `slice` ou um array de
+    posições, ver `IndiceHierarquico.posicoes`), nunca uma cópia do DataFrame filtrado. Mesmo as
+    seleções que são `slice` (a maioria, no índice ordenado) ocupam `CUSTO_ENTRADA_BYTES` do limite.
+    """
+
+    @staticmethod
+    def tamanho(selecao):
+        """Memória (bytes) de uma seleção, além do custo da entrada: as posições de um array; um `slice`, 0."""
+        return selecao.nbytes if isinstance(selecao, np.ndarray) else 0
+
+
+# AGREGAÇÃO POR GRUPO (códigos das categorias + np.bincount)
+# As tabelas das páginas (por componente, DIREC e série) são somas, médias e contagens por grupo.
+# Em vez de groupby().agg() com funções Python por grupo, os grupos viram os códigos inteiros da
+# categoria e cada coluna é somada de uma vez com np.bincount. As colunas float (somas de notas)
+# são somadas pelos mesmos códigos com o groupby().sum() do pandas, que usa soma compensada: com a
+# soma simples do bincount, médias como 6,005 arredondavam diferente do que as páginas mostravam.
+
+def agregar_por_grupo(chave, somas=None, medias=None, contagens=None):
+    """
+    Somas, médias e contagens por valor de `chave`, uma passada de np.bincount por coluna.
+
+    Parameters
+    ----------
+    chave : pandas.Series
+        Coluna de agrupamento (category ou outro tipo). Linhas com a chave vazia ficam de fora.
+    somas : dict, optional
+        Nome -> valores a somar por grupo (NaN fica de fora). Colunas inteiras continuam inteiras.
+    medias : dict, optional
+        Nome -> (somas, quantidades): média = soma das somas / soma das quantidades do grupo (NaN
+        se o grupo não tem nenhuma quantidade). Para a média de notas soltas, ignorando as vazias,
+        basta passar (notas, notas.notna()).
+    contagens : pandas.Series, optional
+        Coluna categórica (por exemplo a situação do estudante): uma coluna de contagem por
+        categoria, com o nome da categoria.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por grupo presente, na ordem das categorias da chave, com o índice do mesmo tipo
+        e nome da chave (como groupby(chave, observed=True)).
+    """
+    grupos = chave.astype('category')
+    categorias = grupos.cat.categories
+    codigos = grupos.cat.codes.to_numpy()
+    validos = codigos >= 0
+    todos_validos = validos.all()
+    if not todos_validos:
+        codigos = codigos[validos]
+    n_grupos = len(categorias)
+    presentes = np.bincount(codigos, minlength=n_grupos) > 0
+    codigos_categoricos = pd.Categorical.from_codes(codigos, categories=range(n_grupos))
+
+    def somar(valores):
+        valores = np.asarray(valores)
+        if not todos_validos:
+            valores = valores[validos]
+        if valores.dtype.kind in 'biu':
+            return np.bincount(codigos, weights=valores, minlength=n_grupos).astype(np.int64)[presentes]
+        return pd.Series(valores).groupby(codigos_categoricos, observed=False).sum().to_numpy()[presentes]
+
+    colunas = {nome: somar(valores) for nome, valores in (somas or {}).items()}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for nome, (soma, quantidade) in (medias or {}).items():
+            colunas[nome] = somar(soma) / somar(quantidade)
+    if contagens is not None:
+        valores = contagens.astype('category')
+        codigos_valores = valores.cat.codes.to_numpy()
+        if not todos_validos:
+            codigos_valores = codigos_valores[validos]
+        n_valores = len(valores.cat.categories)
+        com_valor = codigos_valores >= 0
+        tabela = np.bincount(codigos[com_valor] * n_valores + codigos_valores[com_valor],
+                             minlength=n_grupos * n_valores).reshape(n_grupos, n_valores)[presentes]
+        for posicao, valor in enumerate(valores.cat.categories):
+            colunas[valor] = tabela[:, posicao]
+
+    if isinstance(chave.dtype, pd.CategoricalDtype):
+        indice = pd.CategoricalIndex(pd.Categorical.from_codes(np.flatnonzero(presentes), dtype=chave.dtype),
+                                     name=chave.name)
+    else:
+        indice = pd.Index(categorias[presentes], name=chave.name)
+    return pd.DataFrame(colunas, index=indice)
+
+
+# PÁGINA 1: COMPONENTES CURRICULARES (a partir do cubo de agregados)
+
+def aprovacao_por_componente(cubo):
+    """
+    Aprovados, reprovados e percentuais por componente curricular, sem os registros 'Sem nota'.
+
+    Componentes sem nenhum registro com nota ficam de fora. Ordenado pelo % de aprovados.
+    """
+    df_componente = agregar_por_grupo(cubo['COMPONENTE CURRICULAR'],
+                                      somas={'Aprovados': cubo['QTD_APROVADO'], 'Reprovados': cubo['QTD_REPROVADO']})
+    df_componente['Total_Com_Status'] = df_componente['Aprovados'] + df_componente['Reprovados']
+    df_componente = df_componente[df_componente['Total_Com_Status'] > 0].reset_index()
+
+    df_componente['%_Aprovados'] = (df_componente['Aprovados'] / df_componente['Total_Com_Status'] * 100).round(1)
+    df_componente['%_Reprovados'] = (df_componente['Reprovados'] / df_componente['Total_Com_Status'] * 100).round(1)
+    return df_componente.sort_values('%_Aprovados', ascending=True)
+
+
+def taxas_gerais(df_componente):
+    """Taxas de aprovação e de reprovação gerais (%) da tabela de `aprovacao_por_componente`."""
+    total = df_componente['Total_Com_Status'].sum()
+    return ((df_componente['Aprovados'].sum() / total * 100).round(1),
+            (df_componente['Reprovados'].sum() / total * 100).round(1))
+
+
+# Médias das notas: arredondadas para 2 casas com os empates (0,005) para cima, em aritmética inteira.
+# As notas têm no máximo 3 casas decimais (as somas do cubo são de notas arredondadas para 3 casas),
+# então cada soma é um número inteiro de milésimos e a média arredondada sai de uma divisão inteira.
+# Com o round() do float, uma média exata como 4,975 virava 4,97 ou 4,98 conforme o erro de
+# representação acumulado na soma, que depende da ordem e do tipo (float32/float64) das notas somadas.
+COLUNAS_MEDIAS = ['NOTA 1º BIMESTRE', 'NOTA 2º BIMESTRE', 'MEDIA_1_2_BIM']
+
+
+def arredondar_media(somas, quantidades, casas=2):
+    """
+    Médias `somas / quantidades` arredondadas para `casas` decimais, com os empates para cima.
+
+    Parameters
+    ----------
+    somas : array-like
+        Somas de notas com até 3 casas decimais (float).
+    quantidades : array-like
+        Quantidade de notas de cada soma (0: média NaN).
+
+    Returns
+    -------
+    numpy.ndarray
+        Médias arredondadas (float64).
+    """
+    milesimos = np.rint(np.asarray(somas, dtype=np.float64) * 1000).astype(np.int64)
+    quantidades = np.asarray(quantidades, dtype=np.int64)
+    divisor = np.maximum(quantidades, 1) * 10 ** (3 - casas)
+    # arredondamento para cima de milesimos / divisor, para notas >= 0: floor(x + 1/2)
+    arredondadas = (2 * milesimos + divisor) // (2 * divisor)
+    return np.where(quantidades > 0, arredondadas / 10 ** casas, np.nan)
+
+
+def calcular_medias(cubo, coluna_grupo):
+    """Médias (ignorando NaN) de NOTA 1º BIMESTRE, NOTA 2º BIMESTRE e MEDIA_1_2_BIM por `coluna_grupo`, a partir do cubo."""
+    tabela = agregar_por_grupo(cubo[coluna_grupo], somas={f'{prefixo}_{c}': cubo[f'{prefixo}_{c}']
+                                                          for c in COLUNAS_MEDIAS for prefixo in ('SOMA', 'QTD')})
+    return pd.DataFrame({c: arredondar_media(tabela[f'SOMA_{c}'], tabela[f'QTD_{c}']) for c in COLUNAS_MEDIAS},
+                        index=tabela.index)
+
+
+def medias_por_componente(cubo):
+    """Médias por componente curricular, da menor para a maior média do 1º semestre."""
+    return calcular_medias(cubo, 'COMPONENTE CURRICULAR').reset_index().sort_values('MEDIA_1_2_BIM', ascending=True)
+
+
+def medias_por_direc(cubo):
+    """Médias por DIREC, da menor para a maior média do 1º semestre, com o nome truncado para o eixo X."""
+    df_medias_direc = calcular_medias(cubo, 'DIREC').reset_index().sort_values('MEDIA_1_2_BIM', ascending=True)
+    df_medias_direc['DIREC_Truncada'] = df_medias_direc['DIREC'].astype(str).str.slice(0, 9)
+    return df_medias_direc
+
+
+def medias_gerais(df_medias):
+    """Média simples das médias dos grupos, para as métricas acima dos gráficos de médias (empates para cima)."""
+    return tuple(float(arredondar_media(df_medias[c].sum(), df_medias[c].count())) for c in COLUNAS_MEDIAS)
+
+
+# PÁGINA 2: ESTUDANTES (a partir da tabela de estudantes)
+
+# Regras de aprovação dos estudantes: na etapa, o estudante é reprovado quando tem pelo menos
+# LIMITES_REPROVACOES[etapa] componentes com STATUS "Reprovado"; etapas fora da tabela ficam 'Indefinido'
+LIMITES_REPROVACOES = {
+    "Ens. Fund. - Anos Finais": 4,
+    "Ensino Médio": 7,
+}
+SITUACOES = ['Aprovado', 'Reprovado', 'Indefinido']
+
+
+def classificar_situacao(etapas, reprovacoes, limites=LIMITES_REPROVACOES):
+    """
+    Situação de cada estudante x etapa pelas regras de `limites`, de uma vez para todas as linhas.
+
+    Cada etapa (código da categoria) vira o seu limite numa tabela pequena; depois é uma comparação
+    entre dois vetores de inteiros, sem chamar uma função Python por estudante.
+
+    Parameters
+    ----------
+    etapas : pandas.Series
+        ETAPA_RESUMIDA de cada linha (category ou texto).
+    reprovacoes : array-like
+        Quantidade de componentes reprovados de cada linha.
+    limites : dict
+        Etapa -> quantidade mínima de reprovações para a situação 'Reprovado'.
+
+    Returns
+    -------
+    pandas.Series
+        Categórica com as categorias SITUACOES (códigos 0, 1 e 2), no índice de `etapas`.
+    """
+    etapas = etapas.astype('category')
+    # o último item da tabela é o das etapas vazias (código -1)
+    limite_por_codigo = np.array([limites.get(etapa, -1) for etapa in etapas.cat.categories] + [-1])
+    limite = limite_por_codigo[etapas.cat.codes.to_numpy()]
+    codigos = np.where(limite < 0, 2, np.asarray(reprovacoes) >= limite).astype(np.int8)
+    return pd.Series(pd.Categorical.from_codes(codigos, SITUACOES), index=etapas.index)
+
+
+def _situacao(estudantes, situacao):
+    """`situacao` já classificada (ver SituacaoEstudantes) ou a classificação de `estudantes`."""
+    if situacao is None:
+        situacao = classificar_situacao(estudantes['ETAPA_RESUMIDA'], estudantes['QTD_REPROVACOES'])
+    return situacao
+
+
+def resumo_situacao(estudantes, situacao=None):
+    """Total de estudantes, aprovados, reprovados e percentuais (para as métricas e o gráfico de pizza)."""
+    situacao = _situacao(estudantes, situacao)
+    total_estudantes = len(estudantes)
+    aprovados, reprovados, _ = np.bincount(situacao.cat.codes, minlength=len(SITUACOES))
+    return {
+        'total_estudantes': total_estudantes,
+        'aprovados': aprovados,
+        'reprovados': reprovados,
+        'percentual_aprovados': round(aprovados / total_estudantes * 100, 2) if total_estudantes > 0 else 0,
+        'percentual_reprovados': round(reprovados / total_estudantes * 100, 2) if total_estudantes > 0 else 0,
+    }
+
+
+def situacao_por_grupo(estudantes, coluna, situacao=None):
+    """Total de estudantes, aprovados, reprovados e percentuais por `coluna` da tabela de estudantes."""
+    contagens = agregar_por_grupo(estudantes[coluna], contagens=_situacao(estudantes, situacao))
+    situacao = pd.DataFrame({
+        'Total_Estudantes': contagens.sum(axis=1),
+        'Aprovados': contagens['Aprovado'],
+        'Reprovados': contagens['Reprovado'],
+    }).reset_index()
+
+    situacao['%_Aprovados'] = (situacao['Aprovados'] / situacao['Total_Estudantes'] * 100).round(1)
+    situacao['%_Reprovados'] = (situacao['Reprovados'] / situacao['Total_Estudantes'] * 100).round(1)
+    return situacao
+
+
+def situacao_por_direc(estudantes, situacao=None):
+    """Situação dos estudantes por DIREC (a mais frequente de cada estudante), em ordem numérica de DIREC."""
+    situacao = situacao_por_grupo(estudantes, 'DIREC', situacao)
+
+    # Ordenar as DIRECs em ordem crescente (01ª, 02ª, 03ª, etc.)
+    try:
+        # Extrair o número da DIREC para ordenação numérica
+        situacao['NUMERO_DIREC'] = situacao['DIREC'].str.extract(r'(\d+)').astype(int)
+        situacao = situacao.sort_values('NUMERO_DIREC')
+    except:
+        # Se der erro na ordenação numérica, ordena alfabeticamente
+        situacao = situacao.sort_values('DIREC')
+
+    # Truncar nomes das DIRECs para 9 caracteres
+    situacao['DIREC_Truncada'] = situacao['DIREC'].astype(str).str.slice(0, 9)
+    return situacao
+
+
+def situacao_por_serie(estudantes, situacao=None):
+    """Situação dos estudantes por série (a mais frequente de cada estudante), em ordem de série."""
+    situacao = situacao_por_grupo(estudantes, 'SÉRIE', situacao)
+
+    # Ordenar as séries de forma lógica
+    try:
+        situacao['SERIE_ORDENADA'] = pd.Categorical(
+            situacao['SÉRIE'],
+            categories=sorted(situacao['SÉRIE'].unique(), key=lambda x: (float(x.split()[0]) if x.split()[0].isdigit() else float('inf'), x)),
+            ordered=True
+        )
+        situacao = situacao.sort_values('SERIE_ORDENADA')
+    except:
+        situacao = situacao.sort_values('SÉRIE')
+    return situacao
+
+
+class SituacaoEstudantes:
+    """
+    Situação dos estudantes de uma seleção (filtros laterais, etapa e série) para as seções da página 2.
+
+    Cada estudante é classificado uma vez (`classificar_situacao`) e o resumo do gráfico de pizza, a
+    tabela por DIREC e a tabela por série saem da mesma classificação. Só as três tabelas (pequenas)
+    ficam no objeto, não os estudantes selecionados, e elas são somente leitura: o dados_dashboard
+    entrega o mesmo objeto a todas as seções e sessões com a mesma seleção.
+
+    Parameters
+    ----------
+    estudantes : pandas.DataFrame
+        Tabela de estudantes já filtrada.
+
+    Attributes
+    ----------
+    vazia : bool
+        Se a seleção não tem nenhum estudante.
+    resumo : dict
+        Ver `resumo_situacao`.
+    por_direc, por_serie : pandas.DataFrame
+        Ver `situacao_por_direc` e `situacao_por_serie`.
+    """
+
+    def __init__(self, estudantes):
+        situacao = classificar_situacao(estudantes['ETAPA_RESUMIDA'], estudantes['QTD_REPROVACOES'])
+        self.vazia = len(estudantes) == 0
+        self.resumo = resumo_situacao(estudantes, situacao)
+        self.por_direc = situacao_por_direc(estudantes, situacao)
+        self.por_serie = situacao_por_serie(estudantes, situacao)
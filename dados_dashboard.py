@@ -0,0 +1,217 @@
+# Dados do dashboard, compartilhados por todas as sessões e páginas
+#
+# Os arquivos de dados_tratados/ são lidos uma única vez por processo (st.cache_resource) e o mesmo
+# DataFrame é entregue a todas as sessões e páginas, sem cópia. Com st.cache_data (ou guardando o
+# DataFrame em st.session_state), cada sessão recebia a sua própria cópia dos dados e a memória do
+# servidor crescia com o número de usuários conectados. Na sessão de cada usuário ficam só os filtros
+# selecionados (filtro_direc, filtro_municipio e filtro_escola).
+#
+# Os DataFrames devolvidos aqui são somente leitura: as páginas e o calculos_dashboard filtram e
+# agregam, mas nunca alteram um DataFrame compartilhado no próprio objeto. Com o copy-on-write do
+# pandas (padrão a partir do pandas 3.0, ligado abaixo nas versões anteriores), colunas novas e filtros
+# sobre eles não copiam nem alteram os dados compartilhados.
+#
+# Todos os caches recebem a impressão digital do arquivo de dados (caminho, data de modificação,
+# tamanho e id da execução do processamento_local.py que o gravou): quando o processamento grava
+# dados novos, a impressão digital muda e os caches são refeitos sozinhos, sem limpar os caches de
+# todo o servidor (st.cache_data.clear()). Os dados da versão anterior saem da memória assim que a
+# nova versão é carregada (max_entries=1).
+import functools
+import json
+import os
+
+import pandas as pd
+import streamlit as st
+
+import calculos_dashboard as calc
+import graficos_dashboard as graf
+from esquema_dados import ARQUIVO_EXECUCAO_ETL
+
+PASTA_DADOS = 'dados_tratados'
+ARQUIVO_CUBO = 'cubo_notas.parquet'
+ARQUIVO_ESTUDANTES = 'estudantes.parquet'
+
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+@functools.lru_cache(maxsize=4)
+def _ler_id_execucao(caminho, mtime_ns, tamanho, inode):
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f).get('id_execucao')
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def id_execucao_etl():
+    """
+    Id da última execução do processamento que gravou os dados tratados (None se não houver).
+
+    A impressão digital é consultada a cada acesso aos dados: o execucao_etl.json só é lido e
+    interpretado de novo quando muda (data de modificação, tamanho ou inode, já que o processamento
+    troca o arquivo inteiro com os.replace); nas outras consultas, custa um os.stat.
+    """
+    caminho = os.path.abspath(os.path.join(PASTA_DADOS, ARQUIVO_EXECUCAO_ETL))
+    try:
+        informacoes = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return _ler_id_execucao(caminho, informacoes.st_mtime_ns, informacoes.st_size, informacoes.st_ino)
+
+
+def impressao_digital(arquivo):
+    """
+    Impressão digital de um arquivo de dados tratados, usada como chave dos caches.
+
+    Returns
+    -------
+    tuple
+        Caminho absoluto, data de modificação (ns), tamanho (bytes) e id da execução do processamento.
+    """
+    caminho = os.path.abspath(os.path.join(PASTA_DADOS, arquivo))
+    informacoes = os.stat(caminho)
+    return caminho, informacoes.st_mtime_ns, informacoes.st_size, id_execucao_etl()
+
+
+# Os dados são carregados já com o índice DIREC -> Município -> Escola (calc.IndiceHierarquico): os
+# filtros laterais devolvem fatias dos DataFrames compartilhados, sem percorrer nem copiar a tabela,
+# e as opções dos filtros vêm da hierarquia do índice
+@st.cache_resource(max_entries=1)
+def _carregar_cubo(versao):
+    return calc.IndiceHierarquico(pd.read_parquet(versao[0]))
+
+
+@st.cache_resource(max_entries=1)
+def _carregar_estudantes(versao):
+    return calc.IndiceHierarquico(pd.read_parquet(versao[0]))
+
+
+def carregar_cubo():
+    """Cubo de agregados (escola x série x componente), usado pela página 1 e pelos filtros laterais."""
+    return _carregar_cubo(impressao_digital(ARQUIVO_CUBO)).df
+
+
+def carregar_estudantes():
+    """Tabela de estudantes (CPF x etapa), usada pela página 2."""
+    return _carregar_estudantes(impressao_digital(ARQUIVO_ESTUDANTES)).df
+
+
+def colunas_cubo():
+    """Colunas do cubo, para as seções da página 1 conferirem quais filtros de gráfico existem."""
+    return _carregar_cubo(impressao_digital(ARQUIVO_CUBO)).df.columns
+
+
+def colunas_estudantes():
+    """Colunas da tabela de estudantes, para as seções da página 2 conferirem quais filtros existem."""
+    return _carregar_estudantes(impressao_digital(ARQUIVO_ESTUDANTES)).df.columns
+
+
+# Opções dos filtros, consultadas no catálogo que o calc.IndiceHierarquico monta junto com os dados
+# (uma vez por versão dos dados). Os filtros laterais usam o cubo, que tem as mesmas DIRECs, municípios
+# e escolas da base completa
+def opcoes_direc():
+    return _carregar_cubo(impressao_digital(ARQUIVO_CUBO)).opcoes_direc()
+
+
+def opcoes_municipio(direc):
+    return _carregar_cubo(impressao_digital(ARQUIVO_CUBO)).opcoes_municipio(direc)
+
+
+def opcoes_escola(direc, municipio):
+    return _carregar_cubo(impressao_digital(ARQUIVO_CUBO)).opcoes_escola(direc, municipio)
+
+
+def opcoes_grafico_cubo(direc, municipio, escola, coluna, todos='Todas'):
+    """Opções do selectbox de `coluna` de um gráfico da página 1, para os filtros laterais."""
+    return _carregar_cubo(impressao_digital(ARQUIVO_CUBO)).opcoes_grafico(direc, municipio, escola, coluna, todos)
+
+
+def opcoes_grafico_estudantes(direc, municipio, escola, coluna, todos='Todas'):
+    """Opções do selectbox de `coluna` de um gráfico da página 2, para os filtros laterais."""
+    return _carregar_estudantes(impressao_digital(ARQUIVO_ESTUDANTES)).opcoes_grafico(direc, municipio, escola,
+                                                                                     coluna, todos)
+
+
+def rotulos_escolas():
+    """Código INEP -> "NOME (cód. Inep: 12345678)", para mostrar as opções do filtro de escola."""
+    return _carregar_cubo(impressao_digital(ARQUIVO_CUBO)).rotulos
+
+
+# Resultados dos filtros (laterais e dos gráficos): o cache guarda só as linhas selecionadas de cada
+# combinação de filtros, com memória limitada e descarte LRU (calc.CacheSelecoes), compartilhado por
+# todas as sessões; o DataFrame filtrado é montado na hora a partir dos dados compartilhados (uma
+# fatia sem cópia quando as linhas são contíguas). A chave inclui a impressão digital dos dados, então
+# seleções de dados antigos nunca são usadas e saem do cache pelo descarte LRU: cada entrada ocupa
+# pelo menos calc.CUSTO_ENTRADA_BYTES do limite e o número de entradas também é limitado.
+LIMITE_CACHE_SELECOES_MB = 64
+MAX_SELECOES = 20_000
+
+
+@st.cache_resource
+def cache_selecoes():
+    return calc.CacheSelecoes(LIMITE_CACHE_SELECOES_MB * 2**20, max_entradas=MAX_SELECOES)
+
+
+def _filtrar(indice, nome, versao, filtros):
+    posicoes = cache_selecoes().obter((nome, versao, *filtros), lambda: indice.posicoes(*filtros))
+    return indice.df.iloc[posicoes]
+
+
+def filtrar_cubo(direc, municipio, escola, etapa='Todas', serie='Todas', componente='Todos'):
+    versao = impressao_digital(ARQUIVO_CUBO)
+    return _filtrar(_carregar_cubo(versao), 'cubo', versao, (direc, municipio, escola, etapa, serie, componente))
+
+
+def filtrar_estudantes(direc, municipio, escola, etapa='Todas', serie='Todas'):
+    versao = impressao_digital(ARQUIVO_ESTUDANTES)
+    return _filtrar(_carregar_estudantes(versao), 'estudantes', versao, (direc, municipio, escola, etapa, serie))
+
+
+def estatisticas_cache():
+    """Acertos, faltas, descartes e memória do cache de seleções (ver calc.CacheLRU.estatisticas)."""
+    return cache_selecoes().estatisticas()
+
+
+# Situação dos estudantes da página 2 (resumo, por DIREC e por série), calculada uma vez por seleção
+# (filtros laterais, etapa e série): as seções da página e as sessões com a mesma seleção recebem o
+# mesmo calc.SituacaoEstudantes, sem classificar os estudantes de novo. A série é a seção sem filtros
+# próprios, a mesma seleção do gráfico de pizza com 'Todas' nos dois selectboxes.
+MAX_SITUACOES = 256
+
+
+@st.cache_resource(max_entries=MAX_SITUACOES)
+def _situacao_estudantes(versao, filtros):
+    return calc.SituacaoEstudantes(_filtrar(_carregar_estudantes(versao), 'estudantes', versao, filtros))
+
+
+def situacao_estudantes(direc, municipio, escola, etapa='Todas', serie='Todas'):
+    return _situacao_estudantes(impressao_digital(ARQUIVO_ESTUDANTES), (direc, municipio, escola, etapa, serie))
+
+
+# Figuras dos gráficos: montadas uma vez por conteúdo da tabela agregada (graf.impressao_tabela) e
+# opções do gráfico, e reaproveitadas por todas as seções e sessões que mostram a mesma tabela, com
+# memória limitada e descarte LRU (graf.CacheFiguras, com o tamanho de cada figura estimado pela
+# tabela, sem serializá-la). As figuras do cache são compartilhadas e mutáveis, por isso não saem
+# daqui: `grafico` as exibe direto. O st.plotly_chart ainda copia (to_dict) e serializa a figura a
+# cada execução (~5 ms no gráfico por DIREC, contra ~20 ms para montá-la); passar a especificação já
+# serializada não evita esse custo, porque o st.plotly_chart valida de novo as figuras dadas como dict.
+LIMITE_CACHE_FIGURAS_MB = 32
+
+
+@st.cache_resource
+def cache_figuras():
+    return graf.CacheFiguras(LIMITE_CACHE_FIGURAS_MB * 2**20)
+
+
+def grafico(construtor, tabela, **opcoes):
+    """Exibe (st.plotly_chart) a figura `construtor(tabela, **opcoes)`, montada ou do cache de figuras."""
+    chave = (construtor.__name__, graf.impressao_tabela(tabela), tuple(sorted(opcoes.items())))
+    figura = cache_figuras().obter(chave, lambda: construtor(tabela, **opcoes),
+                                   tamanho=graf.CacheFiguras.tamanho_tabela(tabela))
+    st.plotly_chart(figura, use_container_width=True)
+
+
+def estatisticas_figuras():
+    """Acertos, faltas, descartes e memória do cache de figuras (ver calc.CacheLRU.estatisticas)."""
+    return cache_figuras().estatisticas()
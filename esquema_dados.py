@@ -0,0 +1,138 @@
+# Esquema dos dados tratados (dados_tratados/df_EF_EM_bncc_censo.parquet)
+#
+# As colunas categóricas principais têm dicionários fixos: a ordem das listas abaixo define os
+# códigos das categorias, então o mesmo valor tem sempre o mesmo código em todas as execuções do
+# processamento (e o dashboard pode comparar códigos em vez de textos). Valores que não estão na
+# lista são acrescentados no fim, em ordem alfabética, com um aviso - nesse caso, atualizar a lista.
+import numpy as np
+import pandas as pd
+
+# 16 Diretorias Regionais de Educação do RN, na ordem numérica
+CATEGORIAS_DIREC = [
+    "01ª DIREC - NATAL",
+    "02ª DIREC - PARNAMIRIM",
+    "03ª DIREC - NOVA CRUZ",
+    "04ª DIREC - SÃO PAULO DO POTENGI",
+    "05ª DIREC - CEARÁ-MIRIM",
+    "06ª DIREC - MACAU",
+    "07ª DIREC - SANTA CRUZ",
+    "08ª DIREC - ANGICOS",
+    "09ª DIREC - CURRAIS NOVOS",
+    "10ª DIREC - CAICÓ",
+    "11ª DIREC - ASSU",
+    "12ª DIREC - MOSSORÓ",
+    "13ª DIREC - APODI",
+    "14ª DIREC - UMARIZAL",
+    "15ª DIREC - PAU DOS FERROS",
+    "16ª DIREC - JOÃO CÂMARA",
+]
+
+# séries já padronizadas (6º Ano -> 6º ANO), do 6º ano do fundamental à 3ª série do médio
+CATEGORIAS_SERIE = ["6º ANO", "7º ANO", "8º ANO", "9º ANO", "1ª SÉRIE", "2ª SÉRIE", "3ª SÉRIE"]
+
+CATEGORIAS_ETAPA_RESUMIDA = ["Ens. Fund. - Anos Finais", "Ensino Médio"]
+
+# componentes da BNCC mantidos na análise
+CATEGORIAS_COMPONENTE = [
+    "Arte",
+    "Biologia",
+    "Ciências",
+    "Educação Física",
+    "Filosofia",
+    "Física",
+    "Geografia",
+    "História",
+    "Língua Inglesa",
+    "Língua Portuguesa",
+    "Matemática",
+    "Química",
+    "Sociologia",
+]
+
+CATEGORIAS_STATUS = ["Aprovado", "Reprovado", "Sem nota"]
+
+# arquivo gravado na pasta dos dados tratados ao final de cada execução do processamento, com o id
+# da execução; o dashboard usa esse id (com caminho, data de modificação e tamanho dos .parquet)
+# para saber quando os dados mudaram e os seus caches precisam ser refeitos
+ARQUIVO_EXECUCAO_ETL = "execucao_etl.json"
+
+# tipo de cada coluna da saída:
+#   lista      -> category com o dicionário fixo
+#   "category" -> category com as categorias em ordem alfabética (os valores mudam a cada exportação)
+#   outro      -> dtype do pandas
+ESQUEMA_SAIDA = {
+    "DIREC": CATEGORIAS_DIREC,
+    "MUNICÍPIO": "category",
+    "INEP ESCOLA": "UInt32",
+    "ESCOLA": "category",
+    "ETAPA ENSINO": "category",
+    "SÉRIE": CATEGORIAS_SERIE,
+    "COMPONENTE CURRICULAR": CATEGORIAS_COMPONENTE,
+    "CPF PESSOA": "string",
+    "NOME ESTUDANTE": "category",
+    "NOTA 1º BIMESTRE": "float32",
+    "NOTA 2º BIMESTRE": "float32",
+    "NOTA 3º BIMESTRE": "float32",
+    "NOTA 4º BIMESTRE": "float32",
+    "MÉDIA ANUAL": "float32",
+    "EXAME FINAL": "float32",
+    "AVALIAÇÃO ESPECIAL": "float32",
+    "MÉDIA FINAL": "float32",
+    "ETAPA_RESUMIDA": CATEGORIAS_ETAPA_RESUMIDA,
+    "MEDIA_1_2_BIM": "float32",
+    "STATUS": CATEGORIAS_STATUS,
+}
+
+
+def categorizar(valores, categorias):
+    """
+    Converte `valores` para category com o dicionário `categorias`, na ordem informada.
+
+    Valores fora do dicionário são acrescentados no fim, em ordem alfabética, para não virarem NaN.
+
+    Returns
+    -------
+    tuple of (pandas.Categorical, list)
+        Valores convertidos e lista dos valores que não estavam no dicionário.
+    """
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        # só as categorias (poucas) precisam ser comparadas
+        presentes = valores.cat.categories[np.unique(valores.cat.codes[valores.cat.codes >= 0])]
+    else:
+        presentes = pd.unique(valores.dropna())
+    novos = sorted(set(presentes) - set(categorias))
+    return pd.Categorical(valores, categories=list(categorias) + novos), novos
+
+
+def aplicar_esquema(df, esquema=ESQUEMA_SAIDA):
+    """
+    Aplica os tipos de `esquema` às colunas de `df`, coluna por coluna, sem copiar o DataFrame.
+
+    Colunas que não estão no esquema ficam como estão.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame a ser convertido (alterado no próprio objeto).
+    esquema : dict
+        Tipo de cada coluna (ver ESQUEMA_SAIDA).
+
+    Returns
+    -------
+    dict
+        Valores fora do dicionário fixo, por coluna (vazio se todos os valores eram esperados).
+    """
+    valores_inesperados = {}
+    for coluna, tipo in esquema.items():
+        if coluna not in df.columns:
+            continue
+        if isinstance(tipo, list):
+            df[coluna], novos = categorizar(df[coluna], tipo)
+            if novos:
+                valores_inesperados[coluna] = novos
+                print(f"⚠️  {coluna}: {len(novos)} valor(es) fora do esquema, acrescentado(s) no fim: {novos[:5]}")
+        elif tipo == "category":
+            df[coluna] = pd.Categorical(df[coluna], categories=sorted(pd.unique(df[coluna].dropna())))
+        elif df[coluna].dtype != tipo:
+            df[coluna] = df[coluna].astype(tipo)
+    return valores_inesperados
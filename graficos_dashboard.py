@@ -0,0 +1,392 @@
+# Gráficos do dashboard (plotly), sem Streamlit: cada função monta a figura de uma seção das páginas
+# a partir da tabela agregada da seção (calculos_dashboard). As figuras ficam no cache de figuras do
+# dados_dashboard (dados.figura), pela impressão digital da tabela: a mesma tabela (por exemplo, os
+# gráficos por DIREC sem filtro lateral, iguais para quase todos os usuários) reaproveita a figura já
+# montada e validada, sem refazer os traces e os textos de hover.
+import hashlib
+
+import pandas as pd
+import plotly.graph_objects as go
+
+import calculos_dashboard as calc
+
+
+def impressao_tabela(tabela):
+    """
+    Impressão digital do conteúdo de uma tabela agregada, usada como chave do cache de figuras.
+
+    Para um DataFrame: hash das colunas, dos tipos e de todas as linhas (com o índice, na ordem em
+    que estão). Para outros valores pequenos (como o dicionário de `calc.resumo_situacao`): o `repr`.
+    """
+    if not isinstance(tabela, pd.DataFrame):
+        return repr(tabela)
+    impressao = hashlib.blake2b(digest_size=16)
+    impressao.update(repr((list(tabela.columns), [str(tipo) for tipo in tabela.dtypes])).encode())
+    impressao.update(pd.util.hash_pandas_object(tabela, index=True).to_numpy().tobytes())
+    return impressao.hexdigest()
+
+
+# tamanho estimado de uma figura serializada (JSON enviado ao navegador): o layout e o tema, mais os
+# valores, textos e hovers de cada célula da tabela agregada (medido nas figuras das páginas: de ~7 KB
+# com poucas linhas a ~14 KB com as DIRECs; uma folga em cada termo)
+BYTES_FIGURA = 8_000
+BYTES_POR_CELULA = 64
+
+
+class CacheFiguras(calc.CacheLRU):
+    """
+    Cache LRU das figuras (ver `calc.CacheLRU`), limitado pelo tamanho estimado das figuras.
+
+    O tamanho de cada figura é estimado pela tabela agregada de que ela é montada
+    (`tamanho_tabela`), sem serializar a figura só para medi-la. As figuras guardadas são
+    compartilhadas pelas sessões e não devem ser alteradas depois de montadas (no dashboard,
+    só `dados.grafico` as vê, para exibi-las).
+    """
+
+    @staticmethod
+    def tamanho(figura):
+        return BYTES_FIGURA
+
+    @staticmethod
+    def tamanho_tabela(tabela):
+        """Tamanho estimado (bytes) da figura montada a partir de `tabela`."""
+        celulas = tabela.size if isinstance(tabela, pd.DataFrame) else len(tabela)
+        return BYTES_FIGURA + BYTES_POR_CELULA * celulas
+
+
+def figura_aprovacao_por_componente(df_componente):
+    """Barras empilhadas de % de aprovados e reprovados por componente (tabela de `calc.aprovacao_por_componente`)."""
+    # Criar gráfico de barras empilhadas
+    fig_componente = go.Figure()
+
+    # Barra de aprovados (verde)
+    fig_componente.add_trace(go.Bar(
+        name='✅ Aprovados',
+        x=df_componente['COMPONENTE CURRICULAR'],
+        y=df_componente['%_Aprovados'],
+        marker=dict(color='#2e7d32'),
+        text=df_componente['%_Aprovados'].astype(str) + '%',
+        textposition='inside',
+        hovertemplate='<b>%{x}</b><br>Aprovados: %{y}%<br>Total: ' + df_componente['Aprovados'].astype(str) + '<extra></extra>'
+    ))
+
+    # Barra de reprovados (vermelho)
+    fig_componente.add_trace(go.Bar(
+        name='❌ Reprovados',
+        x=df_componente['COMPONENTE CURRICULAR'],
+        y=df_componente['%_Reprovados'],
+        marker=dict(color='#c62828'),
+        text=df_componente['%_Reprovados'].astype(str) + '%',
+        textposition='inside',
+        hovertemplate='<b>%{x}</b><br>Reprovados: %{y}%<br>Total: ' + df_componente['Reprovados'].astype(str) + '<extra></extra>'
+    ))
+
+    # Configurar layout
+    fig_componente.update_layout(
+        title='Percentual de Aprovação e Reprovação por Componente Curricular',
+        xaxis_title='Componente Curricular',
+        yaxis_title='Percentual (%)',
+        barmode='stack',
+        height=600,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(t=80, b=150, l=50, r=50)  # Aumentar margem inferior para caber labels
+    )
+
+    # Rodar labels do eixo X em 45 graus para melhor visualização
+    fig_componente.update_xaxes(
+        tickangle=-45,
+        tickmode='array',
+        tickvals=df_componente['COMPONENTE CURRICULAR'],
+        ticktext=df_componente['COMPONENTE CURRICULAR']
+    )
+
+    # Ajustar eixo Y para ir de 0% a 100%
+    fig_componente.update_yaxes(range=[0, 100])
+
+    return fig_componente
+
+
+def figura_medias_por_componente(df_medias):
+    """Barras agrupadas das médias por componente (tabela de `calc.medias_por_componente`)."""
+    # Criar gráfico de barras agrupadas
+    fig_medias = go.Figure()
+
+    # Adicionar barras para cada tipo de nota
+    fig_medias.add_trace(go.Bar(
+        name='1º BIMESTRE',
+        x=df_medias['COMPONENTE CURRICULAR'],
+        y=df_medias['NOTA 1º BIMESTRE'],
+        marker_color='#e6b17e',  # Marrom claro
+        text=df_medias['NOTA 1º BIMESTRE'].astype(str),
+        textposition='auto',
+        hovertemplate='<b>%{x}</b><br>1º Bimestre: %{y}<extra></extra>'
+    ))
+
+    fig_medias.add_trace(go.Bar(
+        name='2º BIMESTRE',
+        x=df_medias['COMPONENTE CURRICULAR'],
+        y=df_medias['NOTA 2º BIMESTRE'],
+        marker_color='#d39c6b',  # Marrom médio
+        text=df_medias['NOTA 2º BIMESTRE'].astype(str),
+        textposition='auto',
+        hovertemplate='<b>%{x}</b><br>2º Bimestre: %{y}<extra></extra>'
+    ))
+
+    fig_medias.add_trace(go.Bar(
+        name='MÉDIA 1º SEMESTRE',
+        x=df_medias['COMPONENTE CURRICULAR'],
+        y=df_medias['MEDIA_1_2_BIM'],
+        marker_color='#cc8a42',  # Marrom especificado
+        text=df_medias['MEDIA_1_2_BIM'].astype(str),
+        textposition='auto',
+        hovertemplate='<b>%{x}</b><br>Média 1º Semestre: %{y}<extra></extra>'
+    ))
+
+    # Configurar layout
+    fig_medias.update_layout(
+        title='Médias das Notas por Componente Curricular',
+        xaxis_title='Componente Curricular',
+        yaxis_title='Média das Notas (0-10)',
+        barmode='group',  # Barras agrupadas
+        height=600,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(t=80, b=150, l=50, r=50)
+    )
+
+    # Rodar labels do eixo X para melhor visualização
+    fig_medias.update_xaxes(
+        tickangle=-45,
+        tickmode='array',
+        tickvals=df_medias['COMPONENTE CURRICULAR'],
+        ticktext=df_medias['COMPONENTE CURRICULAR']
+    )
+
+    # Ajustar eixo Y para ir de 0 a 10
+    fig_medias.update_yaxes(range=[0, 10])
+
+    return fig_medias
+
+
+def figura_medias_por_direc(df_medias_direc):
+    """Barras agrupadas das médias por DIREC (tabela de `calc.medias_por_direc`)."""
+    # Criar gráfico de barras agrupadas
+    fig_medias_direc = go.Figure()
+
+    # Adicionar barras para cada tipo de nota
+    fig_medias_direc.add_trace(go.Bar(
+        name='1º BIMESTRE',
+        x=df_medias_direc['DIREC_Truncada'],
+        y=df_medias_direc['NOTA 1º BIMESTRE'],
+        marker_color='#e6b17e',  # Marrom claro
+        text=df_medias_direc['NOTA 1º BIMESTRE'].astype(str),
+        textposition='auto',
+        customdata=df_medias_direc['DIREC'],  # Passamos a coluna com o nome completo
+        hovertemplate='<b>%{customdata}</b><br>1º Bimestre: %{y}<extra></extra>'
+    ))
+
+    fig_medias_direc.add_trace(go.Bar(
+        name='2º BIMESTRE',
+        x=df_medias_direc['DIREC_Truncada'],
+        y=df_medias_direc['NOTA 2º BIMESTRE'],
+        marker_color='#d39c6b',  # Marrom médio
+        text=df_medias_direc['NOTA 2º BIMESTRE'].astype(str),
+        textposition='auto',
+        customdata=df_medias_direc['DIREC'],  # Passamos a coluna com o nome completo
+        hovertemplate='<b>%{customdata}</b><br>1º Bimestre: %{y}<extra></extra>'
+    ))
+
+    fig_medias_direc.add_trace(go.Bar(
+        name='MÉDIA FINAL',
+        x=df_medias_direc['DIREC_Truncada'],
+        y=df_medias_direc['MEDIA_1_2_BIM'],
+        marker_color='#cc8a42',  # Marrom especificado
+        text=df_medias_direc['MEDIA_1_2_BIM'].astype(str),
+        textposition='auto',
+        customdata=df_medias_direc['DIREC'],  # Passamos a coluna com o nome completo
+        hovertemplate='<b>%{customdata}</b><br>1º Bimestre: %{y}<extra></extra>'
+    ))
+
+    # Configurar layout
+    fig_medias_direc.update_layout(
+        title='Médias das Notas por DIREC',
+        xaxis_title='DIREC',
+        yaxis_title='Média das Notas (0-10)',
+        barmode='group',
+        height=600,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(t=80, b=150, l=50, r=50)
+    )
+
+    # Rodar labels do eixo X para melhor visualização
+    fig_medias_direc.update_xaxes(
+        tickangle=-45,
+        tickmode='array',
+        tickvals=df_medias_direc['DIREC_Truncada'],
+        ticktext=df_medias_direc['DIREC_Truncada']
+    )
+
+    # Ajustar eixo Y para ir de 0 a 10
+    fig_medias_direc.update_yaxes(range=[0, 10])
+
+    return fig_medias_direc
+
+
+def figura_situacao_geral(resumo):
+    """Pizza de aprovados e reprovados (dicionário de `calc.resumo_situacao`)."""
+    aprovados, reprovados = resumo['aprovados'], resumo['reprovados']
+
+    # Criar gráfico de pizza
+    fig_pizza = go.Figure()
+
+    fig_pizza.add_trace(go.Pie(
+        labels=['Aprovados', 'Reprovados'],
+        values=[aprovados, reprovados],
+        hole=0.4,
+        marker=dict(colors=['#2e7d32', '#c62828']),
+        textinfo='percent+label+value',
+        hovertemplate='<b>%{label}</b><br>Quantidade: %{value}<br>Percentual: %{percent}<extra></extra>'
+    ))
+
+    fig_pizza.update_layout(
+        title='Distribuição de Aprovações e Reprovações',
+        height=500,
+        showlegend=False
+    )
+
+    return fig_pizza
+
+
+def figura_situacao_por_direc(situacao_por_direc):
+    """Barras empilhadas de % de estudantes aprovados e reprovados por DIREC (`calc.situacao_por_direc`)."""
+    # Criar gráfico de barras empilhadas
+    fig_direc = go.Figure()
+
+    # Barra de aprovados (verde)
+    fig_direc.add_trace(go.Bar(
+        name='✅ Aprovados',
+        x=situacao_por_direc['DIREC_Truncada'],
+        y=situacao_por_direc['%_Aprovados'],
+        marker=dict(color='#2e7d32'),
+        text=situacao_por_direc['%_Aprovados'].astype(str) + '%',
+        textposition='inside',
+        hovertemplate='<b>%{customdata}</b><br>Aprovados: %{y}%<br>Total: ' + situacao_por_direc['Aprovados'].astype(str) + '<extra></extra>',
+        customdata=situacao_por_direc['DIREC']
+    ))
+
+    # Barra de reprovados (vermelho)
+    fig_direc.add_trace(go.Bar(
+        name='❌ Reprovados',
+        x=situacao_por_direc['DIREC_Truncada'],
+        y=situacao_por_direc['%_Reprovados'],
+        marker=dict(color='#c62828'),
+        text=situacao_por_direc['%_Reprovados'].astype(str) + '%',
+        textposition='inside',
+        hovertemplate='<b>%{customdata}</b><br>Reprovados: %{y}%<br>Total: ' + situacao_por_direc['Reprovados'].astype(str) + '<extra></extra>',
+        customdata=situacao_por_direc['DIREC']
+    ))
+
+    # Configurar layout
+    fig_direc.update_layout(
+        title='Percentual de Aprovações e Reprovações por DIREC',
+        xaxis_title='DIREC',
+        yaxis_title='Percentual (%)',
+        barmode='stack',
+        height=600,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(t=80, b=150, l=50, r=50)
+    )
+
+    # Rodar labels do eixo X para melhor visualização
+    fig_direc.update_xaxes(
+        tickangle=-45,
+        tickmode='array',
+        tickvals=situacao_por_direc['DIREC_Truncada'],
+        ticktext=situacao_por_direc['DIREC_Truncada']
+    )
+
+    # Ajustar eixo Y para ir de 0% a 100%
+    fig_direc.update_yaxes(range=[0, 100])
+
+    return fig_direc
+
+
+def figura_situacao_por_serie(situacao_por_serie):
+    """Barras empilhadas de % de estudantes aprovados e reprovados por série (`calc.situacao_por_serie`)."""
+    # Criar gráfico de barras empilhadas
+    fig_serie = go.Figure()
+
+    # Barra de aprovados (verde)
+    fig_serie.add_trace(go.Bar(
+        name='✅ Aprovados',
+        x=situacao_por_serie['SÉRIE'],
+        y=situacao_por_serie['%_Aprovados'],
+        marker=dict(color='#2e7d32'),
+        text=situacao_por_serie['%_Aprovados'].astype(str) + '%',
+        textposition='inside',
+        hovertemplate='<b>%{x}</b><br>Aprovados: %{y}%<br>Total: ' + situacao_por_serie['Aprovados'].astype(str) + '<extra></extra>'
+    ))
+
+    # Barra de reprovados (vermelho)
+    fig_serie.add_trace(go.Bar(
+        name='❌ Reprovados',
+        x=situacao_por_serie['SÉRIE'],
+        y=situacao_por_serie['%_Reprovados'],
+        marker=dict(color='#c62828'),
+        text=situacao_por_serie['%_Reprovados'].astype(str) + '%',
+        textposition='inside',
+        hovertemplate='<b>%{x}</b><br>Reprovados: %{y}%<br>Total: ' + situacao_por_serie['Reprovados'].astype(str) + '<extra></extra>'
+    ))
+
+    # Configurar layout
+    fig_serie.update_layout(
+        title='Percentual de Aprovações e Reprovações por Série',
+        xaxis_title='Série',
+        yaxis_title='Percentual (%)',
+        barmode='stack',
+        height=600,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(t=80, b=100, l=50, r=50)
+    )
+
+    # Rodar labels do eixo X se necessário
+    fig_serie.update_xaxes(tickangle=-45)
+
+    # Ajustar eixo Y para ir de 0% a 100%
+    fig_serie.update_yaxes(range=[0, 100])
+
+    return fig_serie
@@ -4,50 +4,677 @@ import glob
 import os
 from tqdm import tqdm  # Para barra de progresso
 import numpy as np
+import argparse
+import contextlib
+import functools
+import hashlib
+import json
+import operator
+import shutil
+import sys
+import time
 import warnings
+import openpyxl
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from esquema_dados import ARQUIVO_EXECUCAO_ETL, aplicar_esquema
 warnings.filterwarnings('ignore')
 
-def processar_dados_brutos():
-    # caminho da pasta onde estão os arquivos
-    pasta = r"C:\Users\hugob\Downloads\Notas"
+# caminho da pasta onde estão os arquivos exportados do SIGEduc
+PASTA_NOTAS = r"C:\Users\hugob\Downloads\Notas"
 
-    # lista todos os arquivos .xlsx da pasta
-    arquivos = glob.glob(os.path.join(pasta, "*.xlsx"))
+# arquivo enviado para o Censo Escolar em 28/05 (em Excel)
+ARQUIVO_CENSO = r"C:\Users\hugob\Downloads\Censo Escolar_DADOS CONSOLIDADOS.xlsx"
 
-    # lista para armazenar os dataframes
-    dfs = []
+# pasta onde o dashboard lê os dados tratados
+PASTA_SAIDA = "dados_tratados"
 
-    for arquivo in tqdm(arquivos, desc="Processando arquivos"):
-        # lê cada arquivo, pulando as 2 primeiras linhas
-        df_unico = pd.read_excel(arquivo, skiprows=2)
-        dfs.append(df_unico)
+# saída em dataset particionado (pasta por ETAPA_RESUMIDA/DIREC, no formato Hive "COLUNA=valor")
+COLUNAS_PARTICAO = ["ETAPA_RESUMIDA", "DIREC"]
+# ordem das linhas dentro de cada partição: escolas do mesmo município ficam juntas, e cada escola
+# fica contígua, então as estatísticas de mín./máx. dos grupos de linhas permitem pular os grupos
+# que não têm o município/escola procurado
+COLUNAS_ORDENACAO = ["MUNICÍPIO", "INEP ESCOLA", "COMPONENTE CURRICULAR"]
+LINHAS_POR_GRUPO = 64_000
 
-    # concatena todos em um único dataframe
-    df = pd.concat(dfs, ignore_index=True)
+# cubo de agregados para os gráficos do dashboard (dados_tratados/cubo_notas.parquet): uma linha por
+# escola x série x componente, com a quantidade de registros por STATUS e, para cada nota, a soma e
+# a quantidade de notas lançadas (média = soma / quantidade, para qualquer combinação de filtros)
+COLUNAS_CUBO = ["DIREC", "MUNICÍPIO", "INEP ESCOLA", "ESCOLA", "ETAPA_RESUMIDA", "SÉRIE", "COMPONENTE CURRICULAR"]
+STATUS_CUBO = {"Aprovado": "QTD_APROVADO", "Reprovado": "QTD_REPROVADO", "Sem nota": "QTD_SEM_NOTA"}
 
+# tabela de estudantes para a página de aprovações e reprovações dos estudantes
+# (dados_tratados/estudantes.parquet): uma linha por CPF x etapa
+COLUNAS_ESTUDANTE = ["CPF PESSOA", "ETAPA_RESUMIDA"]
 
+# pasta do cache incremental (um .parquet já limpo por arquivo do SIGEduc + manifesto)
+PASTA_CACHE = "cache_notas"
+# aumentar sempre que a limpeza feita por arquivo mudar, para descartar os shards antigos
+VERSAO_CACHE = 5
+
+# colunas que não são de interesse
+COLUNAS_DESCARTADAS = ['ID DIREC', 'ID MUNICÍPIO', 'ID ESCOLA', 'ID ETAPA ENSINO', 'PERIODICIDADE ETAPA ENSINO', 'ID SÉRIE', 'ID TURMA', 'TURMA', 'TURNO', 'ID PESSOA (PROFESSOR)', 'MATRICULA (PROFESSOR)', 'VÍNCULO', 'NOME DO PROFESSOR', 'DATA INÍCIO ALOCAÇÃO', 'DATA FIM ALOCAÇÃO', 'ID COMPONENTE CURRICULAR', 'PERIODICIDADE COMPONENTE CURRICULAR', 'ID PESSOA', 'MATRÍCULA ESTUDANTE', 'RESULTADO FINAL', 'APROVEITAMENTO DE ESTUDO']
+
+# colunas de notas (com vírgula como separador decimal no SIGEduc)
+COLUNAS_NOTAS = [
+    "NOTA 1º BIMESTRE",
+    "NOTA 2º BIMESTRE",
+    "NOTA 3º BIMESTRE",
+    "NOTA 4º BIMESTRE",
+    "MÉDIA ANUAL",
+    "EXAME FINAL",
+    "AVALIAÇÃO ESPECIAL",
+    "MÉDIA FINAL"
+]
+
+# Esquema dos relatórios de notas do SIGEduc
+# ------------------------------------------
+# Cada arquivo .xlsx tem 2 linhas de título do relatório; a 3ª linha é o cabeçalho e os dados
+# começam na 4ª. Uma linha por estudante x componente curricular. As colunas são as de
+# COLUNAS_DESCARTADAS (IDs, dados do professor, turma, datas de alocação etc., que não são lidas)
+# mais as colunas abaixo, que são as usadas no processamento, com o tipo atribuído na leitura:
+#   "texto"   -> mantido como está (DIREC, MUNICÍPIO, ESCOLA, SÉRIE, COMPONENTE CURRICULAR...)
+#   "cpf"     -> texto; números vindos como célula numérica são convertidos para texto
+#   "inteiro" -> inteiro sem sinal (código Inep da escola)
+#   "nota"    -> float32; o SIGEduc exporta as notas como texto com vírgula decimal ("7,5");
+#                vazios e valores inválidos viram NaN
+# Colunas que não estão em nenhuma das duas listas (ex.: nome do estudante) são mantidas como texto.
+ESQUEMA_SIGEDUC = {
+    "DIREC": "texto",
+    "MUNICÍPIO": "texto",
+    "INEP ESCOLA": "inteiro",
+    "ESCOLA": "texto",
+    "ETAPA ENSINO": "texto",
+    "SÉRIE": "texto",
+    "COMPONENTE CURRICULAR": "texto",
+    "CPF PESSOA": "cpf",
+    **{col: "nota" for col in COLUNAS_NOTAS},
+}
+
+# quantidade de linhas convertidas para DataFrame de cada vez na leitura em streaming
+LINHAS_POR_BLOCO = 50_000
+
+# estimativas usadas para dimensionar a leitura em blocos dentro de um limite de memória:
+# memória de um processo de leitura ocioso (Python + pandas + openpyxl) e memória por linha de
+# um bloco (tuplas do openpyxl + DataFrame do bloco antes do filtro)
+MEMORIA_BASE_LEITOR_MB = 150
+BYTES_POR_LINHA_BLOCO = 1_500
+
+# leitor usado por padrão em processar_dados_brutos ("openpyxl" = streaming; "pandas" = pd.read_excel)
+LEITOR_PADRAO = "openpyxl"
+
+
+def pico_memoria_mb():
+    """Pico de memória residente (RSS) do processo atual, em MB. None se não for possível medir."""
+    try:
+        import resource
+    except ImportError:  # Windows: usa o psutil, se estiver instalado
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2**20
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # no macOS o valor vem em bytes; no Linux, em KB
+    return pico / 2**20 if sys.platform == "darwin" else pico / 2**10
+
+
+def ler_arquivo_notas(arquivo):
+    """
+    Lê um arquivo .xlsx exportado do SIGEduc, pulando as 2 primeiras linhas (cabeçalho do relatório).
+    """
+    return pd.read_excel(arquivo, skiprows=2)
+
+
+def _converter_valor_nota(valor):
+    """Substitui vírgula por ponto nos textos; números e vazios passam direto para o pd.to_numeric."""
+    return valor.replace(",", ".") if isinstance(valor, str) else valor
+
+
+def converter_notas(df, colunas=COLUNAS_NOTAS):
+    """
+    Converte as colunas de notas do SIGEduc ("7,5") para float32, todas de uma vez.
+
+    As notas têm poucos valores distintos (0 a 10 com uma ou duas casas decimais), então cada
+    coluna é fatorada (`pd.factorize`), os valores distintos de todas as colunas são convertidos
+    de texto para número numa única passada, e o resultado de cada coluna é montado indexando
+    os valores convertidos pelos códigos.
+
+    A conversão de cada valor distinto é a mesma de antes (vírgula por ponto + `pd.to_numeric`
+    com `errors="coerce"`): vazios e textos inválidos viram NaN. Células que já vêm como número
+    são mantidas.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame com as colunas de notas como texto. É alterado no próprio objeto.
+    colunas : list of str
+        Colunas de notas; as que não estiverem no DataFrame são ignoradas.
+
+    Returns
+    -------
+    pandas.DataFrame
+        O próprio `df`, com as notas em float32.
+    """
+    colunas = [col for col in colunas if col in df.columns]
+    if not colunas:
+        return df
+
+    # fatorar cada coluna (rápido no tipo nativo da coluna) e deslocar os códigos para que os
+    # valores distintos de todas as colunas fiquem numa única tabela
+    codigos = []
+    unicos = []
+    deslocamento = 0
+    for col in colunas:
+        codigos_col, unicos_col = pd.factorize(df[col])  # vazios (None/NaN) ficam com código -1
+        codigos.append(np.where(codigos_col >= 0, codigos_col + deslocamento, -1))
+        unicos.append(np.asarray(unicos_col, dtype=object))
+        deslocamento += len(unicos_col)
+
+    unicos = pd.Series(np.concatenate(unicos), dtype=object)
+    convertidos = pd.to_numeric(unicos.map(_converter_valor_nota), errors="coerce")
+    # NaN no final, para o código -1 dos vazios
+    tabela = np.append(convertidos.to_numpy(dtype="float32"), np.float32(np.nan))
+
+    for col, codigos_col in zip(colunas, codigos):
+        df[col] = tabela[codigos_col]
+    return df
+
+
+def cpf_como_texto(valores):
+    """
+    CPFs como texto ("string"), do jeito que vierem da planilha: texto, número ou os dois misturados.
+
+    Células numéricas viram os dígitos do número (sem ".0": uma coluna só de números com vazios é lida
+    como float) e a pontuação é mantida; `normalizar_cpf` padroniza depois. Com o tipo "string", os
+    shards .parquet do cache podem ser gravados mesmo quando a coluna mistura int e str.
+    """
+    valores = pd.Series(valores)
+    if pd.api.types.is_float_dtype(valores):
+        # números não inteiros (ou infinitos) não são CPF: ficam vazios
+        inteiros = np.isfinite(valores) & (valores == np.floor(valores))
+        valores = valores.where(inteiros).astype("Int64")
+    return valores.astype("string")
+
+
+def _converter_bloco(linhas, colunas):
+    """Monta o DataFrame de um bloco de linhas já projetadas, atribuindo os tipos de ESQUEMA_SIGEDUC."""
+    df = pd.DataFrame.from_records(linhas, columns=colunas)
+    converter_notas(df, [col for col in colunas if ESQUEMA_SIGEDUC.get(col) == "nota"])
+    for col in colunas:
+        tipo = ESQUEMA_SIGEDUC.get(col, "texto")
+        if tipo == "inteiro":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("UInt32")
+        elif tipo == "cpf":
+            df[col] = cpf_como_texto(df[col])
+    return df
+
+
+def ler_arquivo_notas_streaming(arquivo, linhas_por_bloco=LINHAS_POR_BLOCO, tempos=None, filtrar=False):
+    """
+    Lê um arquivo .xlsx do SIGEduc em streaming, só com as colunas usadas e já com os tipos finais.
+
+    A planilha é aberta no modo somente leitura do openpyxl, que percorre as linhas sem montar a
+    planilha inteira na memória. De cada linha ficam só as colunas que não estão em
+    COLUNAS_DESCARTADAS, e a cada `linhas_por_bloco` linhas o bloco é convertido para um
+    DataFrame tipado (ver ESQUEMA_SIGEDUC). O resultado é o mesmo de
+    `limpar_notas(ler_arquivo_notas(arquivo))`, mas sem manter as 21 colunas descartadas e sem
+    guardar as notas como texto. Linhas totalmente vazias são ignoradas.
+
+    Parameters
+    ----------
+    arquivo : str
+        Caminho do arquivo .xlsx.
+    linhas_por_bloco : int
+        Quantidade de linhas convertidas de cada vez (limita a memória usada com tuplas do openpyxl).
+    tempos : dict, optional
+        Se informado, acumula em "tempo_conversao_tipos_s" o tempo gasto montando os blocos tipados
+        (e filtrando, se `filtrar`) e em "linhas_lidas" as linhas lidas da planilha.
+    filtrar : bool
+        Se True, aplica `filtrar_anos_finais_ensino_medio` em cada bloco, de modo que só as linhas
+        dos Anos Finais/Ensino Médio e dos componentes da BNCC ficam acumuladas.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Dados do arquivo, sem as colunas descartadas.
+    """
+    wb = openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = wb.worksheets[0].iter_rows(min_row=3, values_only=True)
+        cabecalho = next(linhas, None) or ()
+
+        indices = [i for i, col in enumerate(cabecalho) if col is not None and col not in COLUNAS_DESCARTADAS]
+        colunas = [cabecalho[i] for i in indices]
+        projetar = operator.itemgetter(*indices) if len(indices) > 1 else (lambda linha: (linha[indices[0]],))
+        n_colunas = len(cabecalho)
+
+        def converter(bloco):
+            df_bloco = _converter_bloco(bloco, colunas)
+            return filtrar_anos_finais_ensino_medio(df_bloco) if filtrar else df_bloco
+
+        blocos = []
+        bloco = []
+        tempo_conversao = 0.0
+        linhas_lidas = 0
+        for linha in linhas:
+            if len(linha) < n_colunas:
+                linha = linha + (None,) * (n_colunas - len(linha))
+            valores = projetar(linha)
+            if all(valor is None for valor in valores):
+                continue
+            bloco.append(valores)
+            if len(bloco) >= linhas_por_bloco:
+                inicio = time.perf_counter()
+                blocos.append(converter(bloco))
+                tempo_conversao += time.perf_counter() - inicio
+                linhas_lidas += len(bloco)
+                bloco = []
+        if bloco or not blocos:
+            inicio = time.perf_counter()
+            blocos.append(converter(bloco))
+            tempo_conversao += time.perf_counter() - inicio
+            linhas_lidas += len(bloco)
+    finally:
+        wb.close()
+
+    if tempos is not None:
+        tempos["tempo_conversao_tipos_s"] = tempos.get("tempo_conversao_tipos_s", 0.0) + tempo_conversao
+        tempos["linhas_lidas"] = tempos.get("linhas_lidas", 0) + linhas_lidas
+
+    return pd.concat(blocos, ignore_index=True) if len(blocos) > 1 else blocos[0]
+
+
+def limpar_notas(df):
+    """
+    Limpeza feita em cada arquivo logo após a leitura: exclui as colunas que não são de
+    interesse, converte as notas para número e o CPF para texto.
+    """
     # Excluir colunas que não são de interesse
-    df = df.drop(columns=['ID DIREC', 'ID MUNICÍPIO', 'ID ESCOLA', 'ID ETAPA ENSINO', 'PERIODICIDADE ETAPA ENSINO', 'ID SÉRIE', 'ID TURMA', 'TURMA', 'TURNO', 'ID PESSOA (PROFESSOR)', 'MATRICULA (PROFESSOR)', 'VÍNCULO', 'NOME DO PROFESSOR', 'DATA INÍCIO ALOCAÇÃO', 'DATA FIM ALOCAÇÃO', 'ID COMPONENTE CURRICULAR', 'PERIODICIDADE COMPONENTE CURRICULAR', 'ID PESSOA', 'MATRÍCULA ESTUDANTE', 'RESULTADO FINAL', 'APROVEITAMENTO DE ESTUDO'])
-
-    # Substituir vírgula por ponto para reconhecimento das notas como números:
-    colunas_para_converter = [
-        "NOTA 1º BIMESTRE",
-        "NOTA 2º BIMESTRE",
-        "NOTA 3º BIMESTRE",
-        "NOTA 4º BIMESTRE",
-        "MÉDIA ANUAL",
-        "EXAME FINAL",
-        "AVALIAÇÃO ESPECIAL",
-        "MÉDIA FINAL"
-    ] 
-
-    for col in colunas_para_converter:
-        if col in df.columns:  # só executa se a coluna estiver no DataFrame
-            # Substitui vírgula por ponto
-            df[col] = df[col].str.replace(",", ".")
-            # Converte para float, erros viram NaN
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.drop(columns=COLUNAS_DESCARTADAS)
+
+    # CPF como texto, como no leitor em streaming: o pd.read_excel mistura int e str na coluna quando
+    # há células numéricas, e o shard .parquet do cache não pode ser gravado assim
+    df["CPF PESSOA"] = cpf_como_texto(df["CPF PESSOA"])
+
+    # Substituir vírgula por ponto para reconhecimento das notas como números (erros viram NaN):
+    return converter_notas(df)
+
+
+def processar_arquivo_notas(arquivo, leitor=LEITOR_PADRAO, tempos=None, filtrar=False,
+                            linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Lê e limpa um arquivo de notas, com o leitor em streaming ("openpyxl") ou com pd.read_excel ("pandas").
+
+    Com `filtrar=True`, as séries/componentes fora da análise são descartados já na leitura (a
+    cada bloco no leitor em streaming; no arquivo inteiro com o pandas). Se `tempos` for um dict,
+    acumula nele o tempo de conversão de tipos ("tempo_conversao_tipos_s") e as linhas lidas.
+    """
+    if leitor == "openpyxl":
+        return ler_arquivo_notas_streaming(arquivo, linhas_por_bloco=linhas_por_bloco, tempos=tempos, filtrar=filtrar)
+    if leitor == "pandas":
+        df = ler_arquivo_notas(arquivo)
+        inicio = time.perf_counter()
+        linhas_lidas = len(df)
+        df = limpar_notas(df)
+        if filtrar:
+            df = filtrar_anos_finais_ensino_medio(df)
+        if tempos is not None:
+            tempos["tempo_conversao_tipos_s"] = tempos.get("tempo_conversao_tipos_s", 0.0) + time.perf_counter() - inicio
+            tempos["linhas_lidas"] = tempos.get("linhas_lidas", 0) + linhas_lidas
+        return df
+    raise ValueError(f"Leitor desconhecido: {leitor!r} (use 'openpyxl' ou 'pandas')")
+
+
+def _processar_arquivo_medindo(arquivo, leitor=LEITOR_PADRAO, filtrar=False, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Lê e limpa um arquivo de notas e devolve também as medições da leitura.
+
+    Definida no nível do módulo para poder ser enviada aos processos de leitura paralela.
+    """
+    tempos = {"tempo_conversao_tipos_s": 0.0, "linhas_lidas": 0}
+    inicio = time.perf_counter()
+    df = processar_arquivo_notas(arquivo, leitor=leitor, tempos=tempos, filtrar=filtrar, linhas_por_bloco=linhas_por_bloco)
+    tempo_total = time.perf_counter() - inicio
+    medicao = {
+        "arquivo": os.path.basename(arquivo),
+        "linhas_lidas": tempos["linhas_lidas"],
+        "linhas": len(df),
+        "tempo_excel_s": tempo_total - tempos["tempo_conversao_tipos_s"],
+        "tempo_conversao_tipos_s": tempos["tempo_conversao_tipos_s"],
+        "pico_rss_mb": pico_memoria_mb(),
+    }
+    return df, medicao
+
+
+def planejar_leitura_em_blocos(limite_memoria_mb, n_processos=None):
+    """
+    Escolhe a quantidade de processos de leitura e o tamanho dos blocos para caber em `limite_memoria_mb`.
+
+    Metade do limite fica para o processo principal (dados já filtrados de todos os arquivos,
+    concatenação e etapas seguintes) e a outra metade é dividida entre os processos de leitura.
+    Cada processo precisa de MEMORIA_BASE_LEITOR_MB mais o bloco em conversão
+    (BYTES_POR_LINHA_BLOCO por linha); os blocos ficam entre 5 mil e 200 mil linhas.
+
+    Returns
+    -------
+    tuple of (int, int)
+        Quantidade de processos e linhas por bloco.
+    """
+    n_processos = n_processos or os.cpu_count() or 1
+    memoria_leitores = limite_memoria_mb / 2
+    # cada processo precisa pelo menos da memória base mais um bloco pequeno
+    n_processos = max(1, min(n_processos, int(memoria_leitores // (MEMORIA_BASE_LEITOR_MB + 50))))
+    memoria_bloco = (memoria_leitores / n_processos - MEMORIA_BASE_LEITOR_MB) * 2**20
+    linhas_por_bloco = int(min(max(memoria_bloco / BYTES_POR_LINHA_BLOCO, 5_000), 200_000))
+    return n_processos, linhas_por_bloco
+
+
+def ler_arquivos_notas(arquivos, n_processos=None, leitor=LEITOR_PADRAO, medicoes=None, filtrar=False,
+                       linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Lê e limpa todos os arquivos de notas e devolve a lista de DataFrames na mesma ordem de `arquivos`.
+
+    A leitura do openpyxl usa um único núcleo, então os arquivos são lidos em paralelo por um
+    pool de processos. Com `n_processos=1` (ou um único arquivo) a leitura é sequencial, como
+    era antes; se o pool falhar (ex.: falta de memória em algum processo), os arquivos são
+    lidos novamente de forma sequencial.
+
+    Parameters
+    ----------
+    arquivos : list of str
+        Caminhos dos arquivos .xlsx.
+    n_processos : int, optional
+        Quantidade de processos de leitura. Se None, usa o número de núcleos da máquina.
+    leitor : str
+        "openpyxl" (streaming, só com as colunas usadas) ou "pandas" (pd.read_excel + limpar_notas).
+    medicoes : list, optional
+        Se informada, recebe um dict por arquivo com linhas, tempo de leitura do Excel, tempo de
+        conversão de tipos e pico de memória do processo que leu o arquivo.
+    filtrar : bool
+        Se True, descarta já na leitura as séries/componentes fora da análise (ver `processar_arquivo_notas`).
+    linhas_por_bloco : int
+        Tamanho dos blocos do leitor em streaming.
+
+    Returns
+    -------
+    list of pandas.DataFrame
+        Um DataFrame por arquivo, na ordem de `arquivos`.
+    """
+    if not arquivos:
+        return []
+
+    if n_processos is None:
+        n_processos = os.cpu_count() or 1
+    n_processos = max(1, min(n_processos, len(arquivos)))
+
+    processar = functools.partial(_processar_arquivo_medindo, leitor=leitor, filtrar=filtrar,
+                                  linhas_por_bloco=linhas_por_bloco)
+
+    resultados = None
+    if n_processos > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                # executor.map devolve os resultados na ordem de entrada, independente de qual termina primeiro
+                resultados = list(tqdm(executor.map(processar, arquivos),
+                                       total=len(arquivos), desc=f"Processando arquivos ({n_processos} processos)"))
+        except (BrokenProcessPool, OSError) as e:
+            print(f"⚠️  Falha na leitura paralela: {e}. Lendo os arquivos sequencialmente.")
+
+    if resultados is None:
+        # leitura sequencial
+        resultados = [processar(arquivo) for arquivo in tqdm(arquivos, desc="Processando arquivos")]
+
+    if medicoes is not None:
+        medicoes.extend(medicao for _, medicao in resultados)
+    return [df for df, _ in resultados]
+
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """Calcula o SHA-256 do conteúdo de um arquivo, lendo em blocos de 1 MB."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def carregar_manifesto(pasta_cache, leitor=LEITOR_PADRAO, filtrar=False):
+    """
+    Lê o manifesto do cache. Se não existir, ou for de outra versão do cache, de outro leitor ou de
+    outro modo de filtro (shards filtrados ou não na leitura), começa um vazio.
+    """
+    caminho = os.path.join(pasta_cache, "manifesto.json")
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifesto = {}
+
+    configuracao = {"versao": VERSAO_CACHE, "leitor": leitor, "filtrado": filtrar}
+    if any(manifesto.get(chave) != valor for chave, valor in configuracao.items()):
+        manifesto = {**configuracao, "arquivos": {}}
+    return manifesto
+
+
+def salvar_manifesto(pasta_cache, manifesto):
+    """Grava o manifesto num arquivo temporário e troca de uma vez, para não deixar um manifesto pela metade."""
+    caminho = os.path.join(pasta_cache, "manifesto.json")
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def ler_arquivos_notas_incremental(arquivos, pasta_cache=PASTA_CACHE, n_processos=None, leitor=LEITOR_PADRAO,
+                                   medicoes=None, filtrar=False, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Lê os arquivos de notas reaproveitando o cache de shards .parquet.
+
+    Para cada arquivo o manifesto guarda tamanho, data de modificação e SHA-256 do conteúdo,
+    além do nome do shard (o DataFrame já limpo por `limpar_notas`). Só são lidos do Excel os
+    arquivos novos ou alterados; os demais vêm direto do shard. Arquivos que saíram da pasta
+    têm seus shards apagados. `medicoes` recebe as medições só dos arquivos lidos do Excel (ver
+    `ler_arquivos_notas`).
+
+    Se tamanho e data de modificação forem iguais aos do manifesto, o arquivo é considerado
+    inalterado sem calcular o hash. Se só a data mudou (ex.: arquivo copiado de novo), o hash
+    decide.
+
+    Returns
+    -------
+    list of pandas.DataFrame
+        Um DataFrame por arquivo, na ordem de `arquivos`.
+    """
+    pasta_shards = os.path.join(pasta_cache, "shards")
+    os.makedirs(pasta_shards, exist_ok=True)
+
+    manifesto = carregar_manifesto(pasta_cache, leitor=leitor, filtrar=filtrar)
+    entradas = manifesto["arquivos"]
+
+    novas_entradas = {}
+    pendentes = []
+    for arquivo in arquivos:
+        nome = os.path.basename(arquivo)
+        info = os.stat(arquivo)
+        shard = os.path.splitext(nome)[0] + ".parquet"
+        entrada = {"tamanho": info.st_size, "mtime_ns": info.st_mtime_ns, "sha256": None, "shard": shard}
+
+        anterior = entradas.get(nome)
+        if anterior is not None and os.path.exists(os.path.join(pasta_shards, anterior["shard"])):
+            if anterior["tamanho"] == info.st_size and anterior["mtime_ns"] == info.st_mtime_ns:
+                novas_entradas[nome] = anterior
+                continue
+            if anterior["tamanho"] == info.st_size:
+                entrada["sha256"] = hash_arquivo(arquivo)
+                if entrada["sha256"] == anterior["sha256"]:
+                    novas_entradas[nome] = entrada
+                    continue
+
+        pendentes.append(arquivo)
+        novas_entradas[nome] = entrada
+
+    print(f"Cache: {len(arquivos) - len(pendentes)} arquivo(s) inalterado(s), {len(pendentes)} para ler.")
+
+    # lê só os arquivos novos ou alterados e grava os shards
+    dfs_novos = dict(zip(pendentes, ler_arquivos_notas(pendentes, n_processos=n_processos, leitor=leitor,
+                                                       medicoes=medicoes, filtrar=filtrar,
+                                                       linhas_por_bloco=linhas_por_bloco)))
+    for arquivo, df_unico in dfs_novos.items():
+        entrada = novas_entradas[os.path.basename(arquivo)]
+        if entrada["sha256"] is None:
+            entrada["sha256"] = hash_arquivo(arquivo)
+        df_unico.to_parquet(os.path.join(pasta_shards, entrada["shard"]))
+
+    # apaga os shards de arquivos que não existem mais na pasta (e sobras de versões antigas)
+    shards_validos = {entrada["shard"] for entrada in novas_entradas.values()}
+    for shard in os.listdir(pasta_shards):
+        if shard not in shards_validos:
+            os.remove(os.path.join(pasta_shards, shard))
+
+    manifesto["arquivos"] = novas_entradas
+    salvar_manifesto(pasta_cache, manifesto)
+
+    return [
+        dfs_novos[arquivo] if arquivo in dfs_novos
+        else pd.read_parquet(os.path.join(pasta_shards, novas_entradas[os.path.basename(arquivo)]["shard"]))
+        for arquivo in arquivos
+    ]
+
+
+def salvar_parquet_particionado(df, pasta_dataset, linhas_por_grupo=LINHAS_POR_GRUPO):
+    """
+    Salva o DataFrame como dataset Parquet particionado por COLUNAS_PARTICAO.
+
+    As linhas são ordenadas por COLUNAS_PARTICAO + COLUNAS_ORDENACAO, os arquivos usam compressão
+    zstd, dicionário nas colunas de texto e grupos de linhas de até `linhas_por_grupo` linhas com
+    estatísticas de mín./máx. Quem lê filtrando por DIREC ou etapa (`filters=` do
+    `pd.read_parquet`) só abre as pastas dessas partições; filtros por município ou escola pulam
+    os grupos de linhas pelas estatísticas. O conteúdo anterior da pasta é apagado.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    df_ordenado = df.sort_values(COLUNAS_PARTICAO + COLUNAS_ORDENACAO, kind="stable", ignore_index=True)
+    tabela = pa.Table.from_pandas(df_ordenado, preserve_index=False)
+    del df_ordenado
 
+    shutil.rmtree(pasta_dataset, ignore_errors=True)
+    opcoes = ds.ParquetFileFormat().make_write_options(compression="zstd", use_dictionary=True, write_statistics=True)
+    ds.write_dataset(
+        tabela,
+        pasta_dataset,
+        format="parquet",
+        partitioning=COLUNAS_PARTICAO,
+        partitioning_flavor="hive",
+        file_options=opcoes,
+        max_rows_per_group=linhas_por_grupo,
+        min_rows_per_group=min(linhas_por_grupo, 16_000),
+        basename_template="parte-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def normalizar_cpf(valores):
+    """
+    Converte CPFs para uma chave inteira (int64), usando só os dígitos.
+
+    Aceita CPFs como texto, com ou sem pontuação ("123.456.789-01", " 12345678901 "), ou como
+    número (células numéricas do Excel, que perdem os zeros à esquerda). Como um CPF tem 11
+    dígitos, cabe num int64, e os zeros à esquerda deixam de importar. Vazios e valores sem
+    dígitos ou com mais de 11 dígitos recebem -1, que nunca é considerado igual a nada.
+
+    Os CPFs se repetem uma vez por componente curricular, então a normalização é feita só nos
+    valores distintos (`pd.factorize`) e depois distribuída para as linhas.
+
+    Parameters
+    ----------
+    valores : pandas.Series or array-like
+        CPFs, em qualquer formato.
+
+    Returns
+    -------
+    numpy.ndarray
+        Chaves int64, uma por valor (-1 para CPF inválido).
+    """
+    codigos, unicos = pd.factorize(pd.Series(valores), use_na_sentinel=True)
+    unicos = pd.Series(np.asarray(unicos, dtype=object))
+    chaves_unicos = np.full(len(unicos), -1, dtype="int64")
+
+    eh_texto = unicos.map(lambda valor: isinstance(valor, str)).to_numpy(dtype=bool)
+    if eh_texto.any():
+        digitos = unicos[eh_texto].astype(str).str.replace(r"\D", "", regex=True)
+        validos = digitos.str.len().between(1, 11).to_numpy()
+        chaves_texto = np.full(len(digitos), -1, dtype="int64")
+        chaves_texto[validos] = digitos[validos].astype("int64").to_numpy()
+        chaves_unicos[eh_texto] = chaves_texto
+    if (~eh_texto).any():
+        numeros = pd.to_numeric(unicos[~eh_texto], errors="coerce").to_numpy(dtype="float64")
+        validos = (numeros >= 0) & (numeros < 1e11) & (numeros == np.floor(numeros))
+        chaves_unicos[~eh_texto] = np.where(validos, np.nan_to_num(numeros), -1).astype("int64")
+
+    # NaN/None ficam com código -1 no factorize -> chave -1
+    return np.append(chaves_unicos, -1)[codigos]
+
+
+def formatar_cpf(chaves):
+    """Converte chaves de `normalizar_cpf` de volta para texto com 11 dígitos (chave -1 vira <NA>)."""
+    codigos, unicos = pd.factorize(chaves)
+    texto = pd.Series(unicos).astype(str).str.zfill(11).to_numpy(dtype=object)
+    texto[unicos < 0] = None
+    return pd.array(np.append(texto, None)[codigos], dtype="string")
+
+
+def conciliar_cpfs(chaves_sigeduc, chaves_censo):
+    """
+    Cruza os CPFs do SIGEduc com os do Censo Escolar pelas chaves inteiras de `normalizar_cpf`.
+
+    Os CPFs distintos de cada lado são ordenados uma vez (`np.unique`) e a presença de cada
+    chave do outro lado é verificada por busca binária (`np.searchsorted`). CPFs inválidos
+    (-1) nunca são encontrados.
+
+    Returns
+    -------
+    no_censo : numpy.ndarray of bool
+        Para cada linha do SIGEduc, se o CPF está no Censo (semi-join).
+    ausentes : numpy.ndarray of bool
+        Para cada linha do Censo, se o CPF não está no SIGEduc (anti-join).
+    estatisticas : dict
+        Contagens de linhas e CPFs de cada lado e do cruzamento.
+    """
+    def contem(ordenadas, chaves):
+        if len(ordenadas) == 0:
+            return np.zeros(len(chaves), dtype=bool)
+        posicoes = np.searchsorted(ordenadas, chaves)
+        encontradas = ordenadas[np.minimum(posicoes, len(ordenadas) - 1)] == chaves
+        return encontradas & (chaves >= 0)
+
+    unicas_sigeduc = np.unique(chaves_sigeduc[chaves_sigeduc >= 0])
+    unicas_censo = np.unique(chaves_censo[chaves_censo >= 0])
+
+    no_censo = contem(unicas_censo, chaves_sigeduc)
+    ausentes = ~contem(unicas_sigeduc, chaves_censo)
+
+    estatisticas = {
+        "linhas_sigeduc": int(len(chaves_sigeduc)),
+        "linhas_sigeduc_cpf_invalido": int((chaves_sigeduc < 0).sum()),
+        "cpfs_sigeduc": int(len(unicas_sigeduc)),
+        "linhas_censo": int(len(chaves_censo)),
+        "linhas_censo_cpf_invalido": int((chaves_censo < 0).sum()),
+        "cpfs_censo": int(len(unicas_censo)),
+        "cpfs_em_ambos": int(contem(unicas_censo, unicas_sigeduc).sum()),
+        "linhas_sigeduc_mantidas": int(no_censo.sum()),
+        "linhas_censo_ausentes": int(ausentes.sum()),
+    }
+    return no_censo, ausentes, estatisticas
+
+
+def filtrar_anos_finais_ensino_medio(df):
+    """
+    Mantém só as séries dos Anos Finais e do Ensino Médio e os componentes da BNCC, padroniza os
+    nomes das séries e cria a coluna ETAPA_RESUMIDA.
+    """
     # Manter só Anos Finais e Ensino Médio:
     valores_desejados = ['1ª SÉRIE',
                         '2ª SÉRIE',
@@ -105,6 +732,11 @@ def processar_dados_brutos():
 
     df_EF_EM_bncc['ETAPA_RESUMIDA'] = df_EF_EM_bncc['SÉRIE'].map(mapeamento_etapa)
 
+    return df_EF_EM_bncc
+
+
+def calcular_status(df):
+    """Cria as colunas MEDIA_1_2_BIM e STATUS (Aprovado, Reprovado ou Sem nota) por componente."""
     # Criar coluna com nota final média do 1º semestre, considerando as notas do 1º e 2º bimestres:
     # (ignora os valores NaN e fazem a média somente com os valores presentes. Se só tiver 1 nota disponível, a média será essa nota)
     '''
@@ -112,126 +744,443 @@ def processar_dados_brutos():
     Se apenas uma tem valor → retorna esse valor.
     Se ambas são NaN → retorna NaN.
     '''
-    df_EF_EM_bncc['MEDIA_1_2_BIM'] = df_EF_EM_bncc[['NOTA 1º BIMESTRE','NOTA 2º BIMESTRE']].mean(axis=1, skipna=True)
+    df['MEDIA_1_2_BIM'] = df[['NOTA 1º BIMESTRE','NOTA 2º BIMESTRE']].mean(axis=1, skipna=True)
 
     # Criar uma coluna para Aprovado ou Reprovado por componente (reprovação caso a média seja menor que 6)
                                     ###### MODIFICAR AQUI QUANDO TIVER MAIS NOTAS LANÇADAS ######
     # (sem nota caso os dois bimestres sejam NaN)
-    df_EF_EM_bncc['STATUS'] = np.where(
-        df_EF_EM_bncc['MEDIA_1_2_BIM'].isna(),           # 1️⃣ caso: sem média
+    df['STATUS'] = np.where(
+        df['MEDIA_1_2_BIM'].isna(),           # 1️⃣ caso: sem média
         'Sem nota',
         np.where(
-            df_EF_EM_bncc['MEDIA_1_2_BIM'] >= 6,         # 2️⃣ caso: média suficiente
+            df['MEDIA_1_2_BIM'] >= 6,         # 2️⃣ caso: média suficiente
             'Aprovado',
             'Reprovado'                                  # 3️⃣ caso: média < 6
         )
     )
+    return df
+
+
+def montar_cubo(df):
+    """
+    Agrega `df` por COLUNAS_CUBO para os gráficos do dashboard.
+
+    Para cada combinação presente nos dados: QTD_APROVADO, QTD_REPROVADO e QTD_SEM_NOTA (registros
+    por STATUS) e, para cada coluna de nota e MEDIA_1_2_BIM, SOMA_<coluna> (float64) e
+    QTD_<coluna> (notas não nulas). As somas são de notas arredondadas para 3 casas, então o
+    dashboard calcula as médias exatas das notas lançadas, com os empates (ex.: 4,975) arredondados
+    para cima (ver `calculos_dashboard.arredondar_media`). Combinações com chave vazia (NaN) são
+    mantidas, para que os totais sem filtro sejam iguais aos da base completa.
+
+    Os grupos são numerados uma única vez e cada agregado é um `np.bincount` sobre esses números,
+    então a memória extra é de uma coluna por vez.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Base tratada (uma linha por estudante x componente), com STATUS e MEDIA_1_2_BIM.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Cubo, ordenado pelas chaves.
+    """
+    grupos = df.groupby(COLUNAS_CUBO, observed=True, dropna=False, sort=True)
+    codigos = grupos.ngroup().to_numpy()
+    cubo = grupos.size().to_frame("QTD_REGISTROS").reset_index()
+    n_grupos = len(cubo)
+
+    status = df["STATUS"].to_numpy(dtype=object)
+    for valor, coluna in STATUS_CUBO.items():
+        cubo[coluna] = np.bincount(codigos[status == valor], minlength=n_grupos)
+
+    for coluna in COLUNAS_NOTAS + ["MEDIA_1_2_BIM"]:
+        # as notas têm no máximo 2 casas decimais (a média dos 2 bimestres, 3): arredondar remove o
+        # erro de representação do float32 (7,3 -> 7.30000019) antes de somar
+        notas = np.round(df[coluna].to_numpy(dtype="float64", na_value=np.nan), 3)
+        lancadas = ~np.isnan(notas)
+        cubo[f"SOMA_{coluna}"] = np.bincount(codigos[lancadas], weights=notas[lancadas], minlength=n_grupos)
+        cubo[f"QTD_{coluna}"] = np.bincount(codigos[lancadas], minlength=n_grupos)
+    return cubo
+
+
+def moda_por_grupo(codigos_grupo, valores, n_grupos):
+    """
+    Valor mais frequente de `valores` em cada grupo, por ordenação e contagem de sequências iguais.
+
+    As linhas são ordenadas por (grupo, código do valor); cada sequência de linhas iguais é um par
+    (grupo, valor) e o seu tamanho é a contagem do par. Em caso de empate, fica o menor valor (na
+    ordem das categorias, para colunas category), como em `x.mode().iloc[0]`. Valores vazios não
+    contam.
+
+    Parameters
+    ----------
+    codigos_grupo : numpy.ndarray
+        Código do grupo de cada linha, de 0 a `n_grupos` - 1 (-1: linha fora de qualquer grupo).
+    valores : pandas.Series
+        Valores de cada linha (category, numérico ou texto).
+    n_grupos : int
+
+    Returns
+    -------
+    pandas.Series
+        Um valor por grupo (na ordem dos códigos), com o dtype de `valores`; NaN para grupos sem
+        nenhum valor.
+    """
+    codigos_valor, _ = pd.factorize(valores, sort=True)
+    linhas = np.flatnonzero((codigos_grupo >= 0) & (codigos_valor >= 0))
+    linhas = linhas[np.lexsort((codigos_valor[linhas], codigos_grupo[linhas]))]
+    grupo, valor = codigos_grupo[linhas], codigos_valor[linhas]
+    linha_da_moda = np.full(n_grupos, -1, dtype=np.int64)
+    if len(linhas) == 0:
+        # nenhuma linha com valor: todos os grupos ficam sem moda
+        return pd.Series(valores.array.take(linha_da_moda, allow_fill=True), name=valores.name)
+
+    # início de cada sequência (grupo, valor) e o seu tamanho
+    inicios = np.flatnonzero(np.r_[True, (grupo[1:] != grupo[:-1]) | (valor[1:] != valor[:-1])])
+    tamanhos = np.diff(np.r_[inicios, len(linhas)])
+    # dentro de cada grupo, a maior contagem primeiro; a ordenação estável mantém os valores em
+    # ordem crescente nos empates, então a primeira sequência de cada grupo é a moda
+    sequencias = inicios[np.lexsort((-tamanhos, grupo[inicios]))]
+    grupos_sequencias = grupo[sequencias]
+    modas = sequencias[np.r_[True, grupos_sequencias[1:] != grupos_sequencias[:-1]]]
+
+    # uma linha de `valores` com a moda de cada grupo (-1: grupo sem valor, vira NaN)
+    linha_da_moda[grupo[modas]] = linhas[modas]
+    return pd.Series(valores.array.take(linha_da_moda, allow_fill=True), name=valores.name)
+
+
+def valor_mais_frequente(df, chaves, coluna):
+    """
+    Valor mais frequente de `coluna` para cada combinação de `chaves` (ver `moda_por_grupo`).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por combinação de `chaves` com algum valor em `coluna`, com `chaves` e `coluna`.
+    """
+    grupos = df.groupby(chaves, observed=True, sort=True)
+    tabela = grupos.size().index.to_frame(index=False)
+    codigos = grupos.ngroup().to_numpy(dtype=np.int64, na_value=-1)
+    tabela[coluna] = moda_por_grupo(codigos, df[coluna], grupos.ngroups)
+    return tabela.dropna(subset=[coluna]).reset_index(drop=True)
+
+
+def montar_tabela_estudantes(df):
+    """
+    Resume `df` em uma linha por estudante (CPF) e etapa.
 
-    # Otimizar o DataFrame para reduzir uso de memória
-    # Função otimizada para reduzir o uso de memória, com tratamento de erros
-    def otimizar_tipos(df):
-        """
-        Função para otimizar tipos de colunas de um DataFrame.
-        
-        Procura por colunas de tipo inteiro e float, e as converte para tipos mais eficientes.
-        
-        Também procura por colunas de tipo string e as converte para tipo category, se houver
-        pelo menos 50% de valores únicos.
-        
-        Caso encontre algum erro durante a conversão, mantém o tipo original da coluna.
-        
-        Parameters
-        ----------
-        df : pandas.DataFrame
-            DataFrame a ser otimizado.
-        
-        Returns
-        -------
-        pandas.DataFrame
-            DataFrame com tipos de colunas otimizados.
-        """
-        df_otimizado = df.copy()
-        
-        # Inteiros - com verificações extras
-        int_cols = df.select_dtypes(include=['int']).columns
-        for col in int_cols:
-            try:
-                if df[col].min() >= 0:  # Só positivos
-                    if df[col].max() < 256:  # 0-255
-                        df_otimizado[col] = df[col].astype('uint8')
-                    elif df[col].max() < 65536:  # 0-65535
-                        df_otimizado[col] = df[col].astype('uint16')
-                    elif df[col].max() < 4294967296:  # 0-4294967295
-                        df_otimizado[col] = df[col].astype('uint32')
-                    else:
-                        df_otimizado[col] = df[col].astype('uint64')  # Para valores muito grandes
-                else:  # Com negativos
-                    if df[col].min() >= -128 and df[col].max() < 128:
-                        df_otimizado[col] = df[col].astype('int8')
-                    elif df[col].min() >= -32768 and df[col].max() < 32768:
-                        df_otimizado[col] = df[col].astype('int16')
-                    elif df[col].min() >= -2147483648 and df[col].max() < 2147483648:
-                        df_otimizado[col] = df[col].astype('int32')
-                    else:
-                        df_otimizado[col] = df[col].astype('int64')  # Mantém original
-                        
-            except (ValueError, TypeError) as e:
-                print(f"⚠️  Erro na coluna {col}: {e}. Mantendo tipo original.")
-                df_otimizado[col] = df[col]  # Mantém original em caso de erro
-        
-        # Floats (seguro)
-        float_cols = df.select_dtypes(include=['float']).columns
-        for col in float_cols:
-            df_otimizado[col] = df[col].astype('float32')
-        
-        # Strings → categoria (com threshold ajustável)
-        string_cols = df.select_dtypes(include=['object']).columns
-        for col in string_cols:
-            if df[col].nunique() / len(df) < 0.5:  # Mais conservador: 50% únicos
-                try:
-                    df_otimizado[col] = df[col].astype('category')
-                except Exception as e:
-                    print(f"⚠️  Erro convertendo {col} para category: {e}")
-        
-        return df_otimizado
-
-    # Executar a função de otimização
-    df_EF_EM_bncc = otimizar_tipos(df_EF_EM_bncc)
-
-
-    # Filtrar linhas somente com os CPFs na base dados que foi enviada para o Censo Escolar no dia 28/05
-    # Ler o arquivo enviado para o Censo Escolar em 28/05 (em Excel)
-    df_censo = pd.read_excel(r"C:\Users\hugob\Downloads\Censo Escolar_DADOS CONSOLIDADOS.xlsx")
-
-    # Criar uma lista dos CPFs do Excel (Censo 28/05) (garantindo que sejam strings e sem espaços)
-    cpf_lista = df_censo["CPF"].astype(str).str.strip().unique()
-
-    # Filtrar o df_EF_EM_bncc mantendo apenas linhas cujo CPF PESSOA esteja na lista
-    df_EF_EM_bncc_censo = df_EF_EM_bncc[df_EF_EM_bncc["CPF PESSOA"].astype(str).isin(cpf_lista)]
-
-    # Salvar o DataFrame geral, por componente, no formato .parquet com compressão snappy
-    df_EF_EM_bncc_censo = df_EF_EM_bncc_censo.astype({"CPF PESSOA": "string"})
-    df_EF_EM_bncc_censo.to_parquet("df_EF_EM_bncc_censo.parquet", compression="snappy")
-
-    # Salvar o DataFrame geral, por componente, no formato .parquet com compressão snappy
-    df_EF_EM_bncc_censo = df_EF_EM_bncc_censo.astype({"CPF PESSOA": "string"})
-    df_EF_EM_bncc_censo.to_parquet("df_EF_EM_bncc_censo.parquet", compression="snappy")
-
-    # Criar um dataframe só com os CPFs que estavam na base do Censo Escolar (em 28/05) e não estão no SigEduc atualmente
-    # Garantir que os CPFs sejam strings e padronizados (sem pontos ou traços)
-    df_censo["CPF"] = df_censo["CPF"].astype(str).str.replace(r'\D', '', regex=True).str.zfill(11)
-    df_EF_EM_bncc["CPF PESSOA"] = df_EF_EM_bncc["CPF PESSOA"].astype(str).str.replace(r'\D', '', regex=True).str.zfill(11)
-
-    # Criar o novo DataFrame apenas com CPFs AUSENTES
-    df_censo_ausentes = df_censo[~df_censo["CPF"].isin(df_EF_EM_bncc["CPF PESSOA"])]
-
-    # Salvar em Excel o DataFrame de CPFs ausentes do SigEduc atualmente
-    df_censo_ausentes.to_excel("df_censo_ausentes.xlsx", index=False)
+    Colunas: CPF PESSOA, ETAPA_RESUMIDA, DIREC (a mais frequente entre os registros do estudante),
+    MUNICÍPIO, INEP ESCOLA e ESCOLA (da escola mais frequente dessa DIREC), SÉRIE (a mais frequente),
+    QTD_REPROVACOES (componentes com STATUS "Reprovado") e QTD_COMPONENTES_COM_NOTA (componentes
+    com STATUS diferente de "Sem nota").
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Base tratada (uma linha por estudante x componente), com STATUS.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Tabela de estudantes, ordenada por CPF e etapa.
+    """
+    # os grupos (CPF x etapa) são calculados uma vez e reaproveitados em todas as colunas
+    # (ngroup: -1 para as linhas sem CPF ou sem etapa, que ficam fora da tabela)
+    grupos = df.groupby(COLUNAS_ESTUDANTE, observed=True, sort=True)
+    codigos = grupos.ngroup().to_numpy(dtype=np.int64, na_value=-1)
+    estudantes = grupos.size().index.to_frame(index=False)
+
+    # DIREC: a mais frequente entre os registros do estudante. Município, Inep e escola: o local
+    # (DIREC, MUNICÍPIO, INEP ESCOLA) mais frequente só entre os registros dessa DIREC, para que os
+    # quatro sejam de uma mesma escola (com modas separadas, um estudante transferido com empate
+    # podia ficar com a DIREC de uma escola e o município/Inep de outra, combinação que não existe
+    # no cubo). Só contam as linhas com escola; sem nenhuma, fica o local mais frequente da DIREC
+    codigos_direc, _ = pd.factorize(df["DIREC"], sort=True)
+    moda_direc = moda_por_grupo(codigos, pd.Series(np.where(codigos_direc >= 0, codigos_direc, np.nan)),
+                                grupos.ngroups).to_numpy(dtype=np.int64, na_value=-1)
+    # linhas da DIREC mais frequente do seu estudante (-1 == -1: estudantes sem nenhuma DIREC)
+    na_direc = (codigos >= 0) & (codigos_direc == moda_direc[np.where(codigos >= 0, codigos, 0)])
+    locais = df.groupby(["DIREC", "MUNICÍPIO", "INEP ESCOLA"], observed=True, dropna=False, sort=True).ngroup()
+    moda_local = moda_por_grupo(codigos, locais.where(na_direc & df["INEP ESCOLA"].notna().to_numpy()),
+                                grupos.ngroups)
+    moda_local = moda_local.fillna(moda_por_grupo(codigos, locais.where(na_direc), grupos.ngroups))
+    # primeira linha de cada local (o mesmo Inep tem sempre o mesmo nome e município)
+    _, primeiras_linhas = np.unique(locais.to_numpy(), return_index=True)
+    linhas_locais = primeiras_linhas[moda_local.to_numpy(dtype=np.int64, na_value=0)]
+    for coluna in ["DIREC", "MUNICÍPIO", "INEP ESCOLA", "ESCOLA"]:
+        estudantes[coluna] = df[coluna].array.take(linhas_locais)
+    estudantes["SÉRIE"] = moda_por_grupo(codigos, df["SÉRIE"], grupos.ngroups)
+
+    status = df["STATUS"]
+    com_grupo = codigos >= 0
+    for coluna, linhas in [("QTD_REPROVACOES", status == "Reprovado"), ("QTD_COMPONENTES_COM_NOTA", status != "Sem nota")]:
+        estudantes[coluna] = np.bincount(codigos[com_grupo & linhas.to_numpy()], minlength=grupos.ngroups).astype("int16")
+    return estudantes
+
+
+class RelatorioExecucao:
+    """
+    Registra tempo, CPU, linhas e memória de cada etapa do processamento.
+
+    Cada etapa é medida com `with relatorio.etapa(nome, linhas_entrada) as etapa:`; dentro do
+    bloco, `etapa["linhas_saida"]` (e qualquer outra informação da etapa) pode ser preenchido.
+    O tempo de CPU inclui o dos processos filhos já encerrados (leitura paralela). A memória é o
+    pico de RSS do processo principal ao final da etapa e quanto ele subiu durante a etapa.
+
+    No final, `finalizar` imprime um resumo e salva o relatório em JSON, um arquivo por execução,
+    para comparar execuções diferentes.
+    """
+
+    def __init__(self, parametros=None):
+        agora = datetime.now()
+        self.id_execucao = agora.strftime("%Y%m%d-%H%M%S")
+        self.inicio = agora.isoformat(timespec="seconds")
+        self.parametros = parametros or {}
+        self.etapas = []
+        self.informacoes = {}
+        self._relogio = time.perf_counter()
+
+    @contextlib.contextmanager
+    def etapa(self, nome, linhas_entrada=None):
+        registro = {"etapa": nome, "linhas_entrada": linhas_entrada, "linhas_saida": None}
+        tempos_inicio = os.times()
+        relogio_inicio = time.perf_counter()
+        pico_inicio = pico_memoria_mb()
+        try:
+            yield registro
+        finally:
+            tempos_fim = os.times()
+            pico_fim = pico_memoria_mb()
+            registro["tempo_s"] = round(time.perf_counter() - relogio_inicio, 3)
+            registro["cpu_s"] = round(sum(tempos_fim[:4]) - sum(tempos_inicio[:4]), 3)
+            registro["pico_rss_mb"] = round(pico_fim, 1) if pico_fim is not None else None
+            registro["aumento_pico_rss_mb"] = round(pico_fim - pico_inicio, 1) if pico_fim is not None else None
+            self.etapas.append(registro)
+
+    def como_dict(self):
+        return {
+            "id_execucao": self.id_execucao,
+            "inicio": self.inicio,
+            "tempo_total_s": round(time.perf_counter() - self._relogio, 3),
+            "pico_rss_mb": round(pico_memoria_mb(), 1) if pico_memoria_mb() is not None else None,
+            "parametros": self.parametros,
+            "etapas": self.etapas,
+            **self.informacoes,
+        }
+
+    def resumo(self):
+        """Tabela de texto com uma linha por etapa."""
+        def numero(valor, formato):
+            return format(valor, formato) if valor is not None else "-"
+
+        linhas = [f"{'etapa':<22} {'tempo (s)':>10} {'CPU (s)':>10} {'linhas entrada':>15} {'linhas saída':>15} {'pico RSS (MB)':>14}"]
+        for e in self.etapas:
+            linhas.append(f"{e['etapa']:<22} {e['tempo_s']:>10.2f} {e['cpu_s']:>10.2f} "
+                          f"{numero(e['linhas_entrada'], ',d'):>15} {numero(e['linhas_saida'], ',d'):>15} "
+                          f"{numero(e['pico_rss_mb'], ',.0f'):>14}")
+        dados = self.como_dict()
+        linhas.append(f"{'total':<22} {dados['tempo_total_s']:>10.2f}")
+
+        # informações específicas de cada etapa (ex.: tempo no Excel x conversão de tipos na leitura)
+        padrao = {"etapa", "linhas_entrada", "linhas_saida", "tempo_s", "cpu_s", "pico_rss_mb", "aumento_pico_rss_mb"}
+        for e in self.etapas:
+            extras = {chave: valor for chave, valor in e.items() if chave not in padrao}
+            if extras:
+                linhas.append(f"  {e['etapa']}: " + ", ".join(f"{chave}={valor}" for chave, valor in extras.items()))
+        return "\n".join(linhas)
+
+    def finalizar(self, pasta_relatorios):
+        """Imprime o resumo e salva o relatório em `pasta_relatorios/etl_<id_execucao>.json`. Devolve o caminho."""
+        print(f"\nExecução {self.id_execucao}")
+        print(self.resumo())
+
+        os.makedirs(pasta_relatorios, exist_ok=True)
+        caminho = os.path.join(pasta_relatorios, f"etl_{self.id_execucao}.json")
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, ensure_ascii=False, indent=2)
+        print(f"Relatório salvo em {caminho}")
+        return caminho
+
+
+def salvar_execucao_etl(pasta_saida, relatorio):
+    """
+    Grava `pasta_saida/execucao_etl.json` com o id da execução, depois de todos os .parquet, para
+    que o dashboard perceba que os dados tratados mudaram (arquivo temporário trocado de uma vez).
+    """
+    caminho = os.path.join(pasta_saida, ARQUIVO_EXECUCAO_ETL)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"id_execucao": relatorio.id_execucao, "inicio": relatorio.inicio}, f, ensure_ascii=False, indent=2)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def processar_dados_brutos(pasta=PASTA_NOTAS, n_processos=None, pasta_cache=PASTA_CACHE, leitor=LEITOR_PADRAO,
+                           arquivo_censo=ARQUIVO_CENSO, pasta_saida=PASTA_SAIDA, formato_saida="arquivo",
+                           em_blocos=False, limite_memoria_mb=None):
+    """
+    Processa as notas exportadas do SIGEduc e salva os dados tratados para o dashboard.
+
+    Com `em_blocos=True` (ou informando `limite_memoria_mb`), os filtros de série/componente, a
+    padronização das séries e a ETAPA_RESUMIDA são aplicados em cada bloco de linhas durante a
+    leitura, então só as linhas que ficam na análise são acumuladas na memória. Com
+    `limite_memoria_mb`, a quantidade de processos de leitura e o tamanho dos blocos são
+    escolhidos para caber no limite (ver `planejar_leitura_em_blocos`).
+    """
+    em_blocos = em_blocos or limite_memoria_mb is not None
+    linhas_por_bloco = LINHAS_POR_BLOCO
+    if limite_memoria_mb is not None:
+        n_processos, linhas_por_bloco = planejar_leitura_em_blocos(limite_memoria_mb, n_processos)
+
+    relatorio = RelatorioExecucao(parametros={
+        "pasta": pasta, "n_processos": n_processos, "pasta_cache": pasta_cache, "leitor": leitor,
+        "arquivo_censo": arquivo_censo, "pasta_saida": pasta_saida, "formato_saida": formato_saida,
+        "em_blocos": em_blocos, "limite_memoria_mb": limite_memoria_mb, "linhas_por_bloco": linhas_por_bloco,
+    })
+
+    with relatorio.etapa("leitura") as etapa:
+        # lista todos os arquivos .xlsx da pasta (ordenados, para que a concatenação seja sempre na mesma ordem)
+        arquivos = sorted(glob.glob(os.path.join(pasta, "*.xlsx")))
+
+        # lê e limpa os arquivos (em paralelo, se houver mais de um processo disponível),
+        # reaproveitando o cache dos arquivos que não mudaram desde a última execução
+        medicoes = []
+        # (no modo em blocos, as linhas fora da análise já são descartadas durante a leitura)
+        opcoes_leitura = {"n_processos": n_processos, "leitor": leitor, "medicoes": medicoes,
+                          "filtrar": em_blocos, "linhas_por_bloco": linhas_por_bloco}
+        if pasta_cache:
+            dfs = ler_arquivos_notas_incremental(arquivos, pasta_cache=pasta_cache, **opcoes_leitura)
+        else:
+            dfs = ler_arquivos_notas(arquivos, **opcoes_leitura)
+
+        etapa["arquivos"] = len(arquivos)
+        etapa["arquivos_lidos_do_excel"] = len(medicoes)
+        etapa["linhas_lidas_do_excel"] = sum(m["linhas_lidas"] for m in medicoes)
+        etapa["linhas_saida"] = sum(len(df_unico) for df_unico in dfs)
+        # tempos somados dos arquivos lidos do Excel (medidos em cada processo de leitura)
+        for chave in ("tempo_excel_s", "tempo_conversao_tipos_s"):
+            etapa[chave] = round(sum(m[chave] for m in medicoes), 3)
+        etapa["pico_rss_leitores_mb"] = round(max((m["pico_rss_mb"] or 0 for m in medicoes), default=0), 1)
+
+    with relatorio.etapa("concatenacao", etapa["linhas_saida"]) as etapa:
+        # concatena todos em um único dataframe
+        df = pd.concat(dfs, ignore_index=True)
+        del dfs
+        etapa["linhas_saida"] = len(df)
+
+    if em_blocos:
+        # filtros já aplicados na leitura
+        df_EF_EM_bncc = df
+        del df
+    else:
+        with relatorio.etapa("filtros", len(df)) as etapa:
+            df_EF_EM_bncc = filtrar_anos_finais_ensino_medio(df)
+            del df
+            etapa["linhas_saida"] = len(df_EF_EM_bncc)
+
+    with relatorio.etapa("status", len(df_EF_EM_bncc)) as etapa:
+        df_EF_EM_bncc = calcular_status(df_EF_EM_bncc)
+        etapa["linhas_saida"] = len(df_EF_EM_bncc)
+
+    with relatorio.etapa("esquema", len(df_EF_EM_bncc)) as etapa:
+        # Aplicar os tipos do esquema de saída (categorias com dicionário fixo), coluna por coluna
+        valores_inesperados = aplicar_esquema(df_EF_EM_bncc)
+        etapa["linhas_saida"] = len(df_EF_EM_bncc)
+        etapa["memoria_df_mb"] = round(df_EF_EM_bncc.memory_usage(deep=True).sum() / 2**20, 1)
+        if valores_inesperados:
+            etapa["valores_fora_do_esquema"] = valores_inesperados
+
+    with relatorio.etapa("censo", len(df_EF_EM_bncc)) as etapa:
+        # Filtrar linhas somente com os CPFs na base dados que foi enviada para o Censo Escolar no dia 28/05
+        # Ler o arquivo enviado para o Censo Escolar em 28/05 (em Excel)
+        df_censo = pd.read_excel(arquivo_censo)
+
+        # Normalizar os CPFs dos dois lados uma única vez (só os dígitos, como inteiro), para que
+        # CPFs com pontuação ou sem os zeros à esquerda também sejam encontrados
+        chaves_sigeduc = normalizar_cpf(df_EF_EM_bncc["CPF PESSOA"])
+        chaves_censo = normalizar_cpf(df_censo["CPF"])
+
+        # Cruzar as bases: linhas do SIGEduc com CPF no Censo e estudantes do Censo que não estão no SIGEduc
+        no_censo, ausentes, estatisticas_censo = conciliar_cpfs(chaves_sigeduc, chaves_censo)
+        print(f"Censo: {estatisticas_censo['cpfs_em_ambos']:,} de {estatisticas_censo['cpfs_censo']:,} CPFs do Censo "
+              f"encontrados no SIGEduc ({estatisticas_censo['cpfs_sigeduc']:,} CPFs no SIGEduc); "
+              f"{estatisticas_censo['linhas_censo_ausentes']:,} linha(s) do Censo ausentes; "
+              f"CPFs inválidos: {estatisticas_censo['linhas_sigeduc_cpf_invalido']:,} linha(s) no SIGEduc, "
+              f"{estatisticas_censo['linhas_censo_cpf_invalido']:,} no Censo.")
+
+        # Filtrar o df_EF_EM_bncc mantendo apenas linhas cujo CPF PESSOA esteja no Censo (CPF já padronizado com 11 dígitos)
+        df_EF_EM_bncc_censo = df_EF_EM_bncc[no_censo]
+        df_EF_EM_bncc_censo["CPF PESSOA"] = formatar_cpf(chaves_sigeduc[no_censo])
+
+        # Criar um dataframe só com os CPFs que estavam na base do Censo Escolar (em 28/05) e não estão no SigEduc atualmente
+        # (CPFs padronizados com 11 dígitos; os inválidos ficam como estavam no arquivo do Censo)
+        df_censo_ausentes = df_censo[ausentes].copy()
+        cpf_padronizado = formatar_cpf(chaves_censo[ausentes])
+        df_censo_ausentes["CPF"] = np.where(pd.isna(cpf_padronizado), df_censo_ausentes["CPF"].astype(str), cpf_padronizado)
+
+        etapa["linhas_saida"] = len(df_EF_EM_bncc_censo)
+        etapa["linhas_censo_ausentes"] = len(df_censo_ausentes)
+        relatorio.informacoes["censo"] = estatisticas_censo
+
+    with relatorio.etapa("cubo", len(df_EF_EM_bncc_censo)) as etapa:
+        # Agregados por escola x série x componente, usados pelos gráficos do dashboard
+        df_cubo = montar_cubo(df_EF_EM_bncc_censo)
+        etapa["linhas_saida"] = len(df_cubo)
+
+    with relatorio.etapa("estudantes", len(df_EF_EM_bncc_censo)) as etapa:
+        # Uma linha por estudante x etapa, usada pela página de aprovações e reprovações dos estudantes
+        df_estudantes = montar_tabela_estudantes(df_EF_EM_bncc_censo)
+        etapa["linhas_saida"] = len(df_estudantes)
+
+    with relatorio.etapa("gravacao", len(df_EF_EM_bncc_censo)) as etapa:
+        # Salvar o DataFrame geral, por componente, no formato .parquet
+        os.makedirs(pasta_saida, exist_ok=True)
+        if formato_saida in ("arquivo", "ambos"):
+            # arquivo único com compressão snappy (o que o dashboard lê)
+            df_EF_EM_bncc_censo.to_parquet(os.path.join(pasta_saida, "df_EF_EM_bncc_censo.parquet"), compression="snappy")
+        if formato_saida in ("particionado", "ambos"):
+            # dataset particionado por etapa/DIREC, ordenado e com compressão zstd
+            salvar_parquet_particionado(df_EF_EM_bncc_censo, os.path.join(pasta_saida, "df_EF_EM_bncc_censo"))
+
+        df_cubo.to_parquet(os.path.join(pasta_saida, "cubo_notas.parquet"), compression="snappy")
+        df_estudantes.to_parquet(os.path.join(pasta_saida, "estudantes.parquet"), compression="snappy")
+        salvar_execucao_etl(pasta_saida, relatorio)
+
+        # Salvar em Excel o DataFrame de CPFs ausentes do SigEduc atualmente
+        df_censo_ausentes.to_excel(os.path.join(pasta_saida, "df_censo_ausentes.xlsx"), index=False)
+        etapa["linhas_saida"] = len(df_EF_EM_bncc_censo)
+
+    pico = pico_memoria_mb()
+    if limite_memoria_mb is not None and pico is not None and pico > limite_memoria_mb:
+        print(f"⚠️  Pico de memória do processo principal ({pico:,.0f} MB) acima do limite de {limite_memoria_mb:,} MB.")
+
+    relatorio.finalizar(os.path.join(pasta_saida, "relatorios"))
+    return relatorio
 
 
 # Executar o código acima se rodado diretamente e não como importação em outro módulo
 if __name__ == "__main__":
-    processar_dados_brutos()
+    parser = argparse.ArgumentParser(description="Processa as notas exportadas do SIGEduc.")
+    parser.add_argument("--pasta", default=PASTA_NOTAS, help="pasta com os arquivos .xlsx do SIGEduc")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="quantidade de processos de leitura (padrão: núcleos da máquina; 1 = leitura sequencial)")
+    parser.add_argument("--cache", default=PASTA_CACHE, help="pasta do cache incremental de arquivos já processados")
+    parser.add_argument("--sem-cache", action="store_true", help="lê todos os arquivos do Excel, sem usar o cache")
+    parser.add_argument("--leitor", choices=["openpyxl", "pandas"], default=LEITOR_PADRAO,
+                        help="openpyxl: leitura em streaming só das colunas usadas; pandas: pd.read_excel da planilha inteira")
+    parser.add_argument("--censo", default=ARQUIVO_CENSO, help="arquivo .xlsx enviado para o Censo Escolar")
+    parser.add_argument("--saida", default=PASTA_SAIDA, help="pasta onde os dados tratados são salvos")
+    parser.add_argument("--formato", choices=["arquivo", "particionado", "ambos"], default="arquivo",
+                        help="arquivo: um único .parquet (snappy); particionado: dataset por etapa/DIREC (zstd); ambos")
+    parser.add_argument("--blocos", action="store_true",
+                        help="aplica os filtros de série/componente em cada bloco durante a leitura (menos memória)")
+    parser.add_argument("--limite-memoria", type=int, default=None, metavar="MB",
+                        help="limite de memória em MB; ativa --blocos e ajusta processos e tamanho dos blocos")
+    args = parser.parse_args()
+
+    processar_dados_brutos(pasta=args.pasta, n_processos=args.processos,
+                           pasta_cache=None if args.sem_cache else args.cache, leitor=args.leitor,
+                           arquivo_censo=args.censo, pasta_saida=args.saida, formato_saida=args.formato,
+                           em_blocos=args.blocos, limite_memoria_mb=args.limite_memoria)
 
 
 